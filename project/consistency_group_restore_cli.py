@@ -6,11 +6,23 @@
 ################################################################################
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Optional
 
 API_BASE_URL = "http://localhost:8000"
 
+# One keep-alive session for every menu interaction
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=5,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
 class Colors:
     BOLD = '\033[1m'
     GREEN = '\033[0;32m'
@@ -36,7 +48,7 @@ def list_consistency_groups(database=None):
         url = f"{API_BASE_URL}/consistency-groups"
         if database:
             url += f"?database={database}"
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=(5, 15))
         response.raise_for_status()
         return response.json()
     except Exception as e:
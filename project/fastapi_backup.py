@@ -6,10 +6,11 @@ CORRECTED: Unified API with CG metadata support
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
 import subprocess
 from datetime import datetime
 from pathlib import Path
-import time
+import random
 
 app = FastAPI(title="PostgreSQL Backup Server")
 
@@ -32,6 +33,20 @@ FULL_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 BASE_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 WAL_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
 
+# psql scripts: db_name is bound with -v db=... and quoted by psql itself
+# (:'db' as a literal, :"db" as an identifier), never formatted into the SQL.
+DROP_DB_SQL = """
+UPDATE pg_database SET datallowconn = false WHERE datname = :'db';
+SELECT pg_terminate_backend(pid) FROM pg_stat_activity
+WHERE datname = :'db' AND pid <> pg_backend_pid();
+DROP DATABASE IF EXISTS :"db";
+"""
+CREATE_DB_SQL = 'CREATE DATABASE :"db";\n'
+ENABLE_DB_SQL = """
+UPDATE pg_database SET datallowconn = true WHERE datname = :'db';
+GRANT CONNECT ON DATABASE :"db" TO public;
+"""
+
 # ==============================
 # UNIFIED REQUEST MODELS
 # ==============================
@@ -56,55 +71,63 @@ def validate_db(db_name: str):
     if db_name not in DATABASES:
         raise HTTPException(400, f"Invalid database. Available: {DATABASES}")
 
-def is_in_recovery() -> bool:
+def psql_script_cmd(db_name: str) -> List[str]:
+    """psql command that reads a script from stdin with :db bound to db_name"""
+    return ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
+            "-d", "postgres", "-v", "ON_ERROR_STOP=1", "-v", f"db={db_name}", "-f", "-"]
+
+async def is_in_recovery() -> bool:
     try:
         cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
                "-d", "postgres", "-t", "-c", "SELECT pg_is_in_recovery();"]
-        result = subprocess.check_output(cmd, text=True).strip()
-        return result == "t"
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            return True
+        return out.strip() == b"t"
     except:
         return True
 
-def force_terminate_and_drop(db_name: str, max_retries: int = 10) -> bool:
+def drop_retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter between drop attempts"""
+    return min(2.0, 0.05 * (2 ** (attempt - 1))) + random.uniform(0, 0.05)
+
+async def force_terminate_and_drop(db_name: str, max_retries: int = 10) -> bool:
     for attempt in range(1, max_retries + 1):
         try:
             print(f"[DROP] Attempt {attempt}/{max_retries} to drop {db_name}")
-            drop_cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
-                       "-d", "postgres", "-c", f"""
-                    UPDATE pg_database SET datallowconn = false WHERE datname = '{db_name}';
-                    SELECT pg_terminate_backend(pid) FROM pg_stat_activity 
-                    WHERE datname = '{db_name}' AND pid <> pg_backend_pid();
-                    DROP DATABASE IF EXISTS {db_name};
-                """]
-            result = subprocess.run(drop_cmd, capture_output=True, text=True, timeout=30)
+            result = await asyncio.to_thread(
+                subprocess.run, psql_script_cmd(db_name), input=DROP_DB_SQL,
+                capture_output=True, text=True, timeout=30)
             
             if result.returncode == 0:
                 print(f"[DROP] ✅ Successfully dropped {db_name}")
                 return True
-            elif "does not exist" in (result.stderr or "").lower():
+            stderr_lower = (result.stderr or "").lower()
+            if "does not exist" in stderr_lower:
                 print(f"[DROP] ✅ Database {db_name} already dropped")
                 return True
             
             print(f"[DROP] ⚠️  Attempt {attempt} failed: {result.stderr}")
-            time.sleep(0.5)
+            # A session reconnected between terminate and drop: re-issue immediately
+            if "being accessed by other users" in stderr_lower:
+                continue
+            await asyncio.sleep(drop_retry_delay(attempt))
         except subprocess.TimeoutExpired:
             print(f"[DROP] ⏱️  Attempt {attempt} timed out")
-            time.sleep(0.5)
+            await asyncio.sleep(drop_retry_delay(attempt))
         except Exception as e:
             print(f"[DROP] ❌ Attempt {attempt} error: {str(e)}")
-            time.sleep(0.5)
+            await asyncio.sleep(drop_retry_delay(attempt))
     
     print(f"[DROP] ❌ Failed to drop {db_name} after {max_retries} attempts")
     return False
 
-def enable_db_connections(db_name: str):
+async def enable_db_connections(db_name: str):
     try:
-        cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
-               "-d", "postgres", "-c", f"""
-                UPDATE pg_database SET datallowconn = true WHERE datname = '{db_name}';
-                GRANT CONNECT ON DATABASE {db_name} TO public;
-            """]
-        subprocess.run(cmd, check=False, capture_output=True)
+        await asyncio.to_thread(subprocess.run, psql_script_cmd(db_name), input=ENABLE_DB_SQL,
+                                check=False, capture_output=True, text=True)
         print(f"[RESTORE] ✅ Re-enabled connections to {db_name}")
     except Exception as e:
         print(f"[RESTORE] ⚠️  Failed to re-enable connections: {e}")
@@ -113,14 +136,14 @@ def enable_db_connections(db_name: str):
 # UNIFIED STATUS ENDPOINTS
 # ==============================
 @app.get("/health")
-def health():
+async def health():
     return {
         "status": "healthy",
         "service": "postgres",
         "type": "postgres",
         "server": SERVER_NAME,
         "databases": DATABASES,
-        "recovery_mode": is_in_recovery()
+        "recovery_mode": await is_in_recovery()
     }
 
 @app.get("/")
@@ -147,7 +170,7 @@ def list_databases():
 # UNIFIED BACKUP ENDPOINT
 # ==============================
 @app.post("/backup/{backup_type}")
-def unified_backup(backup_type: str, req: BackupRequest):
+async def unified_backup(backup_type: str, req: BackupRequest):
     """
     Unified backup endpoint: /backup/full, /backup/base, /backup/incremental
     Includes CG metadata (cg_id, cg_name, backup_id) in request
@@ -180,7 +203,7 @@ def unified_backup(backup_type: str, req: BackupRequest):
         
         try:
             with open(backup_file, "w", encoding="utf-8") as f:
-                subprocess.run(cmd, stdout=f, check=True)
+                await asyncio.to_thread(subprocess.run, cmd, stdout=f, check=True)
             
             return {
                 "success": True,
@@ -207,7 +230,7 @@ def unified_backup(backup_type: str, req: BackupRequest):
                "-p", POSTGRES_PORT, "-D", str(dest_dir), "-F", "p", "-X", "stream", "-P"]
         
         try:
-            subprocess.run(cmd, check=True)
+            await asyncio.to_thread(subprocess.run, cmd, check=True)
             return {
                 "success": True,
                 "type": "postgres",
@@ -223,7 +246,7 @@ def unified_backup(backup_type: str, req: BackupRequest):
             raise HTTPException(500, str(e))
     
     elif backup_type == "incremental":
-        if is_in_recovery():
+        if await is_in_recovery():
             return {
                 "success": True,
                 "type": "postgres",
@@ -237,7 +260,7 @@ def unified_backup(backup_type: str, req: BackupRequest):
         try:
             cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
                    "-d", "postgres", "-c", "SELECT pg_switch_wal();"]
-            subprocess.run(cmd, check=True)
+            await asyncio.to_thread(subprocess.run, cmd, check=True)
             
             wal_files = sorted([f.name for f in WAL_ARCHIVE_DIR.glob("*") if f.is_file()], reverse=True)
             
@@ -285,7 +308,7 @@ def list_backups(db_name: str):
 # RESTORE OPERATIONS
 # ==============================
 @app.post("/restore/logical")
-def restore_logical(req: LogicalRestoreRequest):
+async def restore_logical(req: LogicalRestoreRequest):
     validate_db(req.db_name)
     backup_path = FULL_BACKUP_DIR / req.backup_file
     
@@ -294,22 +317,21 @@ def restore_logical(req: LogicalRestoreRequest):
     
     try:
         print(f"[RESTORE] Force dropping {req.db_name}...")
-        if not force_terminate_and_drop(req.db_name):
+        if not await force_terminate_and_drop(req.db_name):
             raise HTTPException(409, f"Failed to drop database {req.db_name}")
         
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         
         print(f"[RESTORE] Creating database {req.db_name}...")
-        create_cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
-                     "-d", "postgres", "-c", f"CREATE DATABASE {req.db_name};"]
-        subprocess.run(create_cmd, check=True, capture_output=True, text=True)
+        await asyncio.to_thread(subprocess.run, psql_script_cmd(req.db_name), input=CREATE_DB_SQL,
+                                check=True, capture_output=True, text=True)
         
         print(f"[RESTORE] Restoring {req.db_name} from {req.backup_file}...")
         restore_cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
                       "-d", req.db_name, "-f", str(backup_path)]
-        subprocess.run(restore_cmd, check=True, capture_output=True, text=True)
+        await asyncio.to_thread(subprocess.run, restore_cmd, check=True, capture_output=True, text=True)
         
-        enable_db_connections(req.db_name)
+        await enable_db_connections(req.db_name)
         
         return {
             "success": True,
@@ -327,7 +349,7 @@ def restore_logical(req: LogicalRestoreRequest):
         raise HTTPException(500, str(e))
 
 @app.post("/restore/auto")
-def auto_restore(req: BackupRequest):
+async def auto_restore(req: BackupRequest):
     if not req.db_name:
         raise HTTPException(400, "db_name required")
     
@@ -342,22 +364,21 @@ def auto_restore(req: BackupRequest):
     
     try:
         print(f"[AUTO-RESTORE] Force dropping {req.db_name}...")
-        if not force_terminate_and_drop(req.db_name):
+        if not await force_terminate_and_drop(req.db_name):
             raise HTTPException(409, f"Failed to drop database {req.db_name}")
         
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         
         print(f"[AUTO-RESTORE] Creating database {req.db_name}...")
-        create_cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
-                     "-d", "postgres", "-c", f"CREATE DATABASE {req.db_name};"]
-        subprocess.run(create_cmd, check=True, capture_output=True, text=True)
+        await asyncio.to_thread(subprocess.run, psql_script_cmd(req.db_name), input=CREATE_DB_SQL,
+                                check=True, capture_output=True, text=True)
         
         print(f"[AUTO-RESTORE] Restoring {req.db_name}...")
         restore_cmd = ["psql", "-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT,
                       "-d", req.db_name, "-f", str(latest_backup)]
-        subprocess.run(restore_cmd, check=True, capture_output=True, text=True)
+        await asyncio.to_thread(subprocess.run, restore_cmd, check=True, capture_output=True, text=True)
         
-        enable_db_connections(req.db_name)
+        await enable_db_connections(req.db_name)
         
         return {
             "success": True,
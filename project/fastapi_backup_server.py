@@ -2,16 +2,29 @@
 PostgreSQL Backup Server (Port 8001)
 COMPLETE FIXED VERSION - Handles concurrent restores without connection errors
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+import asyncio
+import contextlib
+import heapq
+import os
+import random
+import shutil
+import stat
 import subprocess
-from datetime import datetime
-from pathlib import Path
 import time
-from fastapi.responses import FileResponse
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from pathlib import Path
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+import asyncpg
+import orjson
 
-app = FastAPI(title="PostgreSQL Backup Server (Single Server PG1)")
+app = FastAPI(
+    title="PostgreSQL Backup Server (Single Server PG1)",
+    default_response_class=ORJSONResponse,
+)
 
 # ==============================
 # CONFIGURATION
@@ -23,21 +36,93 @@ POSTGRES_USER = "postgres"
 POSTGRES_HOST = "localhost"
 POSTGRES_PORT = "5432"
 
+# Connection arguments shared by every client tool invocation
+PG_CONN_ARGS = ("-U", POSTGRES_USER, "-h", POSTGRES_HOST, "-p", POSTGRES_PORT)
+PSQL_BASE = ("psql", *PG_CONN_ARGS)
+
 DATABASES = [
     "users_db",
     "products_db",
     "reports_db",
 ]
+# Membership checks; DATABASES stays a list for the JSON responses
+DATABASES_SET = frozenset(DATABASES)
+INVALID_DB_DETAIL = f"Invalid database. Available: {DATABASES}"
 
 BACKUP_BASE_DIR = Path("./backups")
 FULL_BACKUP_DIR = BACKUP_BASE_DIR / "full"
 BASE_BACKUP_DIR = BACKUP_BASE_DIR / "base"
 WAL_ARCHIVE_DIR = Path("backups/wal")
 
+# Worker count for parallel pg_dump -Fd / pg_restore / pigz
+PARALLEL_JOBS = str(os.cpu_count() or 4)
+
+# Download-time compressor: pigz uses every core, gzip is the fallback
+GZIP_CMD = ["pigz", "-p", PARALLEL_JOBS, "-1"] if shutil.which("pigz") else ["gzip", "-1"]
+
 FULL_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 BASE_BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 WAL_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
 
+# String forms for building per-request paths with os.path.join
+FULL_BACKUP_DIR_STR = str(FULL_BACKUP_DIR)
+BASE_BACKUP_DIR_STR = str(BASE_BACKUP_DIR)
+
+# ==============================
+# CONNECTION POOL
+# ==============================
+
+# Shared pool for the short control queries (recovery check, terminate/drop,
+# create, WAL switch). pg_dump / pg_basebackup / psql -f stay subprocesses.
+pg_pool: Optional[asyncpg.Pool] = None
+
+
+async def warm_connection(conn: asyncpg.Connection):
+    await conn.execute("SELECT 1")
+
+
+@app.on_event("startup")
+async def open_pg_pool():
+    """
+    Open the pool before serving: create_pool() connects min_size
+    connections up front, and each one runs SELECT 1 once, so the first
+    burst of requests finds warm, verified connections.
+    """
+    global pg_pool
+    pg_pool = await asyncpg.create_pool(
+        user=POSTGRES_USER,
+        host=POSTGRES_HOST,
+        port=int(POSTGRES_PORT),
+        database="postgres",
+        min_size=4,
+        max_size=25,
+        timeout=5,
+        init=warm_connection,
+    )
+
+
+@app.on_event("shutdown")
+async def close_pg_pool():
+    if pg_pool is not None:
+        await pg_pool.close()
+
+
+# (directory, prefix, kind) -> (directory mtime_ns, names); see cached_listing()
+_listing_cache: Dict[tuple, tuple] = {}
+
+# pg_dump / pg_basebackup / restores running at once; more just thrash the disk
+MAX_HEAVY_OPS = 4
+heavy_ops = asyncio.Semaphore(MAX_HEAVY_OPS)
+
+# Filesystem work from async endpoints (scandir, stat). Kept small so a stalled
+# NFS mount ties up at most these threads instead of every request.
+FS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fs")
+
+
+@app.on_event("shutdown")
+def close_fs_pool():
+    FS_POOL.shutdown(wait=False)
+
 # ==============================
 # SCHEMAS
 # ==============================
@@ -69,34 +154,174 @@ class mcBindKey(Structure):
 # ==============================
 
 def validate_db(db_name: str):
-    if db_name not in DATABASES:
+    if db_name not in DATABASES_SET:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid database. Available: {DATABASES}",
+            detail=INVALID_DB_DETAIL,
         )
 
 
-def is_in_recovery() -> bool:
+def backup_timestamp() -> str:
+    """Local time as YYYYmmdd_HHMMSS, formatted without strftime."""
+    t = time.localtime()
+    return (
+        f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}_"
+        f"{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}"
+    )
+
+
+def quote_ident(name: str) -> str:
+    """Quote an SQL identifier (database names can't be bind parameters)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def list_entries(
+    directory: Path,
+    prefix: str = "",
+    kind: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[str]:
+    """
+    Names in directory starting with prefix, newest first (reverse name order).
+    kind limits the result to "file" or "dir" entries; limit keeps only the
+    newest N, selected with heapq instead of sorting the whole directory.
+
+    Uses a single os.scandir pass: DirEntry type checks come from the
+    directory read itself, so no per-entry stat() is issued.
+    """
+    with os.scandir(directory) as it:
+        if kind == "file":
+            names = (e.name for e in it
+                     if e.name.startswith(prefix) and e.is_file(follow_symlinks=False))
+        elif kind == "dir":
+            names = (e.name for e in it
+                     if e.name.startswith(prefix) and e.is_dir(follow_symlinks=False))
+        else:
+            names = (e.name for e in it if e.name.startswith(prefix))
+
+        if limit is not None:
+            return heapq.nlargest(limit, names)
+        return sorted(names, reverse=True)
+
+
+def cached_listing(directory: Path, prefix: str = "", kind: Optional[str] = None) -> List[str]:
+    """
+    list_entries(), reused until the directory's mtime changes, i.e. until an
+    entry is added, removed or renamed. Callers must not mutate the result.
+    """
+    key = (directory, prefix, kind)
+    mtime = os.stat(directory).st_mtime_ns
+
+    cached = _listing_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    names = list_entries(directory, prefix, kind)
+    _listing_cache[key] = (mtime, names)
+    return names
+
+
+async def run_fs(func, *args):
+    """Run a blocking filesystem call in FS_POOL."""
+    return await asyncio.get_running_loop().run_in_executor(FS_POOL, func, *args)
+
+
+async def fs_listing(directory: Path, prefix: str = "", kind: Optional[str] = None) -> List[str]:
+    """
+    cached_listing() for async endpoints. The whole lookup, including the
+    directory stat, runs in FS_POOL, so a stalled mount never blocks the loop.
+    """
+    return await run_fs(cached_listing, directory, prefix, kind)
+
+
+def locate_backup(backup_file: str) -> Optional[tuple]:
+    """
+    (path, stat result) of backup_file in the full or base backup directory.
+    Only direct entries count: ".", ".." and names with a path separator would
+    let a download tar a whole backup tree.
+    """
+    if backup_file in ("", ".", "..") or "/" in backup_file or os.sep in backup_file:
+        return None
+    for directory in (FULL_BACKUP_DIR, BASE_BACKUP_DIR):
+        path = (directory / backup_file).resolve()
+        if path.parent != directory.resolve():
+            continue
+        try:
+            return path, path.stat()
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """True if an If-None-Match header names etag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in if_none_match.split(","))
+
+
+# Recovery state only flips on promote/restore, which take far longer than this
+RECOVERY_CACHE_TTL = 2.0
+_recovery_cache = (float("-inf"), False)  # (time.monotonic() of last check, result)
+
+
+async def is_in_recovery() -> bool:
     """
     Returns True if PostgreSQL is currently in recovery mode.
+    Successful answers are reused for RECOVERY_CACHE_TTL seconds.
     """
+    global _recovery_cache
+    now = time.monotonic()
+    checked_at, in_recovery = _recovery_cache
+    if now - checked_at < RECOVERY_CACHE_TTL:
+        return in_recovery
+
     try:
-        cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-t",
-            "-c", "SELECT pg_is_in_recovery();",
-        ]
-        result = subprocess.check_output(cmd, text=True).strip()
-        return result == "t"
+        in_recovery = await pg_pool.fetchval("SELECT pg_is_in_recovery()")
     except Exception:
         return True
 
+    _recovery_cache = (now, in_recovery)
+    return in_recovery
+
+
+# Dashboards poll /connections/{db} for every database; one grouped query
+# per CONNECTION_COUNTS_TTL serves all of them
+CONNECTION_COUNTS_TTL = 2.0
+# Fail fast instead of queueing behind restores when the pool is exhausted
+POOL_ACQUIRE_TIMEOUT = 2.0
+_connection_counts_cache = (float("-inf"), {})  # (time.monotonic() of query, {datname: count})
+
+
+async def connection_counts() -> Dict[str, int]:
+    """Active connections per database, reused for CONNECTION_COUNTS_TTL seconds."""
+    global _connection_counts_cache
+    now = time.monotonic()
+    queried_at, counts = _connection_counts_cache
+    if now - queried_at < CONNECTION_COUNTS_TTL:
+        return counts
+
+    async with pg_pool.acquire(timeout=POOL_ACQUIRE_TIMEOUT) as conn:
+        rows = await conn.fetch(
+            "SELECT datname, count(*) FROM pg_stat_activity "
+            "WHERE datname IS NOT NULL GROUP BY datname",
+            timeout=5,
+        )
+    counts = {row[0]: row[1] for row in rows}
+
+    _connection_counts_cache = (now, counts)
+    return counts
 
-def force_terminate_and_drop(db_name: str, max_retries: int = 10) -> bool:
+
+def drop_retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, so concurrent restorers don't retry in lockstep."""
+    return min(0.05 * 2 ** attempt, 2.0) + random.uniform(0, 0.1)
+
+
+async def force_terminate_and_drop(db_name: str, max_retries: int = 10) -> bool:
     """
     Aggressively terminate connections and drop database with retry logic.
     This handles race conditions where connections re-establish between terminate and drop.
@@ -107,73 +332,177 @@ def force_terminate_and_drop(db_name: str, max_retries: int = 10) -> bool:
         try:
             print(f"[DROP] Attempt {attempt}/{max_retries} to drop {db_name}")
             
-            # Single atomic operation: block connections + terminate + drop
-            # Using WITH for immediate effect
-            drop_cmd = [
-                "psql",
-                "-U", POSTGRES_USER,
-                "-h", POSTGRES_HOST,
-                "-p", POSTGRES_PORT,
-                "-d", "postgres",
-                "-c", f"""
-                    -- Block new connections IMMEDIATELY
-                    UPDATE pg_database SET datallowconn = false WHERE datname = '{db_name}';
-                    
-                    -- Terminate all existing connections
+            # Block connections + terminate + drop on one pooled connection
+            async with pg_pool.acquire(timeout=30) as conn:
+                # Block new connections IMMEDIATELY
+                await conn.execute(
+                    "UPDATE pg_database SET datallowconn = false WHERE datname = $1",
+                    db_name,
+                    timeout=30,
+                )
+
+                # Terminate all existing connections
+                await conn.execute(
+                    """
                     SELECT pg_terminate_backend(pid)
                     FROM pg_stat_activity
-                    WHERE datname = '{db_name}'
-                    AND pid <> pg_backend_pid();
-                    
-                    -- Drop the database immediately
-                    DROP DATABASE IF EXISTS {db_name};
-                """,
-            ]
-            
-            result = subprocess.run(drop_cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                print(f"[DROP] ✅ Successfully dropped {db_name}")
+                    WHERE datname = $1
+                    AND pid <> pg_backend_pid()
+                    """,
+                    db_name,
+                    timeout=30,
+                )
+
+                # Drop the database immediately
+                await conn.execute(f"DROP DATABASE IF EXISTS {quote_ident(db_name)}", timeout=30)
+
+            print(f"[DROP] ✅ Successfully dropped {db_name}")
+            return True
+
+        except asyncpg.PostgresError as e:
+            # If database doesn't exist, that's also success
+            if "does not exist" in str(e).lower():
+                print(f"[DROP] ✅ Database {db_name} already dropped")
                 return True
-            else:
-                stderr_lower = result.stderr.lower() if result.stderr else ""
-                
-                # If database doesn't exist, that's also success
-                if "does not exist" in stderr_lower:
-                    print(f"[DROP] ✅ Database {db_name} already dropped")
-                    return True
-                
-                print(f"[DROP] ⚠️  Attempt {attempt} failed: {result.stderr}")
-                
-                # Small delay before retry
-                time.sleep(0.5)
-                
-        except subprocess.TimeoutExpired:
+
+            print(f"[DROP] ⚠️  Attempt {attempt} failed: {e}")
+
+            await asyncio.sleep(drop_retry_delay(attempt))
+
+        except asyncio.TimeoutError:
             print(f"[DROP] ⏱️  Attempt {attempt} timed out")
-            time.sleep(0.5)
+            await asyncio.sleep(drop_retry_delay(attempt))
         except Exception as e:
             print(f"[DROP] ❌ Attempt {attempt} error: {str(e)}")
-            time.sleep(0.5)
+            await asyncio.sleep(drop_retry_delay(attempt))
     
     print(f"[DROP] ❌ Failed to drop {db_name} after {max_retries} attempts")
     return False
 
 
-def enable_db_connections(db_name: str):
+async def run_client_tool(cmd: List[str], stdout=None, stderr=asyncio.subprocess.PIPE) -> None:
+    """
+    Run a long-lived PostgreSQL client tool without blocking the event loop.
+    Raises subprocess.CalledProcessError on a non-zero exit; stderr is only
+    decoded then. Pass stdout=DEVNULL for chatty tools whose output is unused.
+    """
+    async with heavy_ops:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=stdout, stderr=stderr)
+        out, err = await proc.communicate()
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode,
+            cmd,
+            output=out,
+            stderr=err.decode(errors="replace") if err else None,
+        )
+
+
+def restore_command(db_name: str, backup_path: Path) -> List[str]:
+    """
+    Command that loads backup_path into db_name.
+    Directory-format dumps restore in parallel with pg_restore -j; legacy
+    plain .sql dumps are replayed with psql -f.
+    """
+    if backup_path.is_dir():
+        return [
+            "pg_restore",
+            *PG_CONN_ARGS,
+            "-j", PARALLEL_JOBS,
+            "-d", db_name,
+            str(backup_path),
+        ]
+    return [
+        *PSQL_BASE,
+        "-d", db_name,
+        "-f", str(backup_path),
+    ]
+
+
+async def stream_subprocess(*cmds: List[str], heavy: bool = False, chunk_size: int = 1 << 20):
+    """
+    Yield the stdout of a pipeline (each command feeds the next) in chunks
+    for a StreamingResponse. The processes are killed if the client
+    disconnects mid-stream. Once the output ends, raises
+    subprocess.CalledProcessError if any command failed, so a chunked
+    response is aborted instead of ending cleanly. heavy=True holds a
+    heavy_ops slot for the whole stream, like run_client_tool.
+    """
+    procs = []
+    stdin = None
+    async with contextlib.AsyncExitStack() as stack:
+        if heavy:
+            await stack.enter_async_context(heavy_ops)
+        try:
+            for i, cmd in enumerate(cmds):
+                if i == len(cmds) - 1:
+                    stdout, read_end = asyncio.subprocess.PIPE, None
+                else:
+                    read_end, stdout = os.pipe()
+                try:
+                    procs.append(await asyncio.create_subprocess_exec(*cmd, stdin=stdin, stdout=stdout))
+                except BaseException:
+                    if read_end is not None:
+                        os.close(read_end)
+                    raise
+                finally:
+                    # The children hold their own copies of the pipe ends
+                    if stdin is not None:
+                        os.close(stdin)
+                    if read_end is not None:
+                        os.close(stdout)
+                stdin = read_end
+
+            while True:
+                data = await procs[-1].stdout.read(chunk_size)
+                if not data:
+                    break
+                yield data
+
+            for proc, cmd in zip(procs, cmds):
+                if await proc.wait():
+                    raise subprocess.CalledProcessError(proc.returncode, cmd)
+        finally:
+            for proc in procs:
+                if proc.returncode is None:
+                    proc.kill()
+                await proc.wait()
+
+
+async def streaming_response(*cmds: List[str], heavy: bool = False, **kwargs) -> StreamingResponse:
+    """
+    StreamingResponse over stream_subprocess, primed with the first chunk
+    before any headers are sent: a pipeline that fails without output (bad
+    database, auth failure) is answered with a 500, not an empty 200.
+    """
+    body = stream_subprocess(*cmds, heavy=heavy)
+    try:
+        first = await body.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except subprocess.CalledProcessError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"{e.cmd[0]} exited with status {e.returncode}"
+        )
+
+    async def chunks():
+        yield first
+        async for data in body:
+            yield data
+
+    return StreamingResponse(chunks(), **kwargs)
+
+
+async def enable_db_connections(db_name: str):
     """Re-enable connections to a database"""
     try:
-        cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-c", f"""
-                UPDATE pg_database SET datallowconn = true WHERE datname = '{db_name}';
-                GRANT CONNECT ON DATABASE {db_name} TO public;
-            """,
-        ]
-        subprocess.run(cmd, check=False, capture_output=True)
+        async with pg_pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE pg_database SET datallowconn = true WHERE datname = $1", db_name
+            )
+            await conn.execute(f"GRANT CONNECT ON DATABASE {quote_ident(db_name)} TO public")
         print(f"[RESTORE] ✅ Re-enabled connections to {db_name}")
     except Exception as e:
         print(f"[RESTORE] ⚠️  Failed to re-enable connections: {e}")
@@ -183,9 +512,10 @@ def enable_db_connections(db_name: str):
 # HEALTH + METADATA
 # ==============================
 
-@app.get("/health")
-def health():
-    return {
+# These payloads only depend on configuration, so they are encoded once.
+# /health has one bit of live state, so both variants are prebuilt.
+HEALTH_JSON = {
+    recovery_mode: orjson.dumps({
         "status": "healthy",
         "server": SERVER_NAME,
         "databases": DATABASES,
@@ -194,57 +524,75 @@ def health():
             "base": str(BASE_BACKUP_DIR),
             "wal_archive": str(WAL_ARCHIVE_DIR),
         },
-        "recovery_mode": is_in_recovery(),
-    }
+        "recovery_mode": recovery_mode,
+    })
+    for recovery_mode in (False, True)
+}
+
+SERVERS_JSON = orjson.dumps({
+    "servers": [
+        {
+            "name": SERVER_NAME,
+            "databases": DATABASES,
+        }
+    ]
+})
+
+DATABASES_JSON = orjson.dumps(DATABASES)
+
+
+@app.get("/health")
+async def health():
+    return Response(
+        content=HEALTH_JSON[bool(await is_in_recovery())],
+        media_type="application/json",
+    )
 
 
 @app.get("/servers")
 def list_servers():
-    return {
-        "servers": [
-            {
-                "name": SERVER_NAME,
-                "databases": DATABASES,
-            }
-        ]
-    }
+    return Response(content=SERVERS_JSON, media_type="application/json")
 
 
 @app.get("/databases")
 def list_databases():
-    return DATABASES
+    return Response(content=DATABASES_JSON, media_type="application/json")
 
 
 # ==============================
-# FULL BACKUP (logical pg_dump)
+# FULL BACKUP (logical pg_dump, directory format)
 # ==============================
 
 @app.post("/backup/full")
-def full_backup(req: BackupRequest):
+async def full_backup(req: BackupRequest):
     validate_db(req.db_name)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_file = FULL_BACKUP_DIR / f"{req.db_name}_full_{timestamp}.sql"
+    timestamp = backup_timestamp()
+    backup_name = f"{req.db_name}_full_{timestamp}"
+    backup_file = os.path.join(FULL_BACKUP_DIR_STR, backup_name)
 
+    # Directory format: one file per table, dumped by PARALLEL_JOBS workers and
+    # compressed inline (-Z 1), so nothing is re-compressed at download time
     cmd = [
         "pg_dump",
-        "-U", POSTGRES_USER,
-        "-h", POSTGRES_HOST,
-        "-p", POSTGRES_PORT,
+        *PG_CONN_ARGS,
+        "-Fd",
+        "-j", PARALLEL_JOBS,
+        "-Z", "1",
+        "-f", backup_file,
         req.db_name,
     ]
 
     try:
-        with open(backup_file, "w", encoding="utf-8") as f:
-            subprocess.run(cmd, stdout=f, check=True)
+        await run_client_tool(cmd)
 
         return {
             "success": True,
             "type": "full",
             "server": SERVER_NAME,
             "database": req.db_name,
-            "backup_file": backup_file.name,
-            "backup_path": str(backup_file),
+            "backup_file": backup_name,
+            "backup_path": backup_file,
             "timestamp": timestamp,
         }
 
@@ -252,34 +600,67 @@ def full_backup(req: BackupRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/backup/full/stream")
+async def full_backup_stream(req: BackupRequest):
+    """
+    Dump a database straight into the response body (custom format, -Z 1).
+    Nothing is written on this host; the caller stores the stream and can
+    load it with pg_restore.
+    """
+    validate_db(req.db_name)
+
+    timestamp = backup_timestamp()
+    backup_name = f"{req.db_name}_full_{timestamp}.dump"
+
+    cmd = [
+        "pg_dump",
+        *PG_CONN_ARGS,
+        "-Fc",
+        "-Z", "1",
+        req.db_name,
+    ]
+
+    print(f"[BACKUP] Streaming {req.db_name} as {backup_name}")
+
+    return await streaming_response(
+        cmd,
+        heavy=True,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{backup_name}"',
+            "X-Timestamp": timestamp,
+        },
+    )
+
+
 # ==============================
 # BASE BACKUP (pg_basebackup)
 # ==============================
 
 @app.post("/backup/base")
-def base_backup():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    dest_dir = BASE_BACKUP_DIR / f"pg_base_{timestamp}"
+async def base_backup():
+    timestamp = backup_timestamp()
+    dest_name = f"pg_base_{timestamp}"
+    dest_dir = os.path.join(BASE_BACKUP_DIR_STR, dest_name)
 
     cmd = [
         "pg_basebackup",
-        "-U", POSTGRES_USER,
-        "-h", POSTGRES_HOST,
-        "-p", POSTGRES_PORT,
-        "-D", str(dest_dir),
+        *PG_CONN_ARGS,
+        "-D", dest_dir,
         "-F", "p",
         "-X", "stream",
         "-P",
     ]
 
     try:
-        subprocess.run(cmd, check=True)
+        # -P progress goes straight to the server console
+        await run_client_tool(cmd, stderr=None)
         return {
             "success": True,
             "type": "base",
             "server": SERVER_NAME,
-            "base_backup_dir": str(dest_dir),
-            "base_backup_name": dest_dir.name,
+            "base_backup_dir": dest_dir,
+            "base_backup_name": dest_name,
             "timestamp": timestamp,
         }
     except Exception as e:
@@ -291,8 +672,8 @@ def base_backup():
 # ==============================
 
 @app.post("/backup/incremental")
-def incremental_backup():
-    if is_in_recovery():
+async def incremental_backup():
+    if await is_in_recovery():
         return {
             "success": True,
             "type": "incremental",
@@ -303,32 +684,21 @@ def incremental_backup():
         }
 
     try:
-        cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-c", "SELECT pg_switch_wal();",
-        ]
+        await pg_pool.execute("SELECT pg_switch_wal()")
 
-        subprocess.run(cmd, check=True)
-
-        wal_files = sorted(
-            [f.name for f in WAL_ARCHIVE_DIR.glob("*") if f.is_file()],
-            reverse=True,
-        )
+        # The switch just archived a segment, so the cached listing would miss anyway
+        wal_files = await run_fs(list_entries, WAL_ARCHIVE_DIR, "", "file", 10)
 
         return {
             "success": True,
             "type": "incremental",
             "server": SERVER_NAME,
             "wal_archive_dir": str(WAL_ARCHIVE_DIR),
-            "current_wal_files": wal_files[:10],
+            "current_wal_files": wal_files,
             "note": "WAL switch completed",
         }
 
-    except subprocess.CalledProcessError as e:
+    except asyncpg.PostgresError as e:
         raise HTTPException(
             status_code=500,
             detail=f"WAL switch failed: {str(e)}",
@@ -340,54 +710,43 @@ def incremental_backup():
 # ==============================
 
 @app.get("/backups/{target}")
-def list_backups(target: str):
+def list_backups(target: str, if_none_match: Optional[str] = Header(None)):
     target_lower = target.lower()
+    if target_lower != SERVER_NAME.lower():
+        validate_db(target)
+
+    # Every listing below changes only when one of these directory mtimes does
+    etag = 'W/"%x"' % max(
+        os.stat(d).st_mtime_ns for d in (FULL_BACKUP_DIR, WAL_ARCHIVE_DIR, BASE_BACKUP_DIR)
+    )
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag})
 
     if target_lower == SERVER_NAME.lower():
         data: Dict[str, Dict[str, List[str]]] = {}
 
         for db in DATABASES:
-            full_backups = sorted(
-                [f.name for f in FULL_BACKUP_DIR.glob(f"{db}_full_*.sql")],
-                reverse=True,
-            )
+            full_backups = cached_listing(FULL_BACKUP_DIR, f"{db}_full_")
             data[db] = {"full_backups": full_backups}
 
-        wal_files = sorted(
-            [f.name for f in WAL_ARCHIVE_DIR.glob("*") if f.is_file()],
-            reverse=True,
-        )
+        wal_files = cached_listing(WAL_ARCHIVE_DIR, kind="file")
 
-        base_backups = sorted(
-            [d.name for d in BASE_BACKUP_DIR.iterdir() if d.is_dir()],
-            reverse=True,
-        )
+        base_backups = cached_listing(BASE_BACKUP_DIR, kind="dir")
 
-        return {
+        return ORJSONResponse({
             "server": SERVER_NAME,
             "databases": data,
             "wal_archive_files": wal_files,
             "base_backups": base_backups,
-        }
-
-    validate_db(target)
+        }, headers={"ETag": etag})
 
-    return {
+    return ORJSONResponse({
         "server": SERVER_NAME,
         "database": target,
-        "full_backups": sorted(
-            [f.name for f in FULL_BACKUP_DIR.glob(f"{target}_full_*.sql")],
-            reverse=True,
-        ),
-        "wal_archive_files": sorted(
-            [f.name for f in WAL_ARCHIVE_DIR.glob("*") if f.is_file()],
-            reverse=True,
-        ),
-        "base_backups": sorted(
-            [d.name for d in BASE_BACKUP_DIR.iterdir() if d.is_dir()],
-            reverse=True,
-        ),
-    }
+        "full_backups": cached_listing(FULL_BACKUP_DIR, f"{target}_full_"),
+        "wal_archive_files": cached_listing(WAL_ARCHIVE_DIR, kind="file"),
+        "base_backups": cached_listing(BASE_BACKUP_DIR, kind="dir"),
+    }, headers={"ETag": etag})
 
 # Add this to your PostgreSQL server (port 8001)
 # Insert after the list_backups endpoint, before restore operations
@@ -397,26 +756,54 @@ def list_backups(target: str):
 # FILE DOWNLOAD ENDPOINT
 # ==============================
 
+class LargeChunkFileResponse(FileResponse):
+    """
+    FileResponse reading 1 MiB per chunk instead of Starlette's 64 KiB.
+    Servers supporting the ASGI pathsend extension hand the file to the
+    kernel (sendfile) and skip the read loop entirely.
+    """
+    chunk_size = 1 << 20
+
+
 @app.get("/download/backup/{backup_file}")
-async def download_backup(backup_file: str):
+async def download_backup(backup_file: str, if_none_match: Optional[str] = Header(None)):
     """
     Download a PostgreSQL backup file.
     Orchestrator uses this to fetch backups.
+    Directory-format dumps are streamed as a plain tar; their members are
+    already compressed by pg_dump.
+    Backups are never modified once written, so a matching If-None-Match
+    gets a 304 and no body.
     """
-    # Check in full backup directory
-    backup_path = FULL_BACKUP_DIR / backup_file
-    
-    if not backup_path.exists():
-        # Try base backup directory
-        backup_path = BASE_BACKUP_DIR / backup_file
-        
-        if not backup_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Backup file '{backup_file}' not found in backup directories"
-            )
-    
-    if not backup_path.is_file():
+    # Check in full backup directory, then base backup directory
+    found = await run_fs(locate_backup, backup_file)
+
+    if found is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Backup file '{backup_file}' not found in backup directories"
+        )
+
+    backup_path, st = found
+    cache_headers = {
+        "ETag": f'"{st.st_ino:x}-{st.st_size:x}-{int(st.st_mtime):x}"',
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+    }
+    if etag_matches(cache_headers["ETag"], if_none_match):
+        return Response(status_code=304, headers=cache_headers)
+
+    if stat.S_ISDIR(st.st_mode):
+        print(f"[DOWNLOAD] Streaming backup directory: {backup_file}")
+        return await streaming_response(
+            ["tar", "-cf", "-", "-C", str(backup_path.parent), backup_path.name],
+            media_type="application/x-tar",
+            headers={
+                "Content-Disposition": f'attachment; filename="{backup_file}.tar"',
+                **cache_headers,
+            },
+        )
+
+    if not stat.S_ISREG(st.st_mode):
         raise HTTPException(
             status_code=400,
             detail=f"'{backup_file}' is not a file"
@@ -424,43 +811,36 @@ async def download_backup(backup_file: str):
     
     print(f"[DOWNLOAD] Serving backup: {backup_file}")
     
-    return FileResponse(
+    return LargeChunkFileResponse(
         path=str(backup_path),
         filename=backup_file,
-        media_type='application/octet-stream'
+        media_type='application/octet-stream',
+        headers=cache_headers,
     )
 
 
 @app.get("/download/base/{base_backup_name}")
 async def download_base_backup(base_backup_name: str):
     """
-    Download a base backup directory as a tar.gz file.
+    Download a base backup directory as a tar.gz stream.
+    The archive is produced and compressed (pigz, all cores) while it is
+    sent; nothing is staged on disk.
     """
-    import tarfile
-    import tempfile
-    
     base_path = BASE_BACKUP_DIR / base_backup_name
     
-    if not base_path.exists() or not base_path.is_dir():
+    if not await run_fs(base_path.is_dir):
         raise HTTPException(
             status_code=404,
             detail=f"Base backup '{base_backup_name}' not found"
         )
     
-    # Create temporary tar.gz file
-    with tempfile.NamedTemporaryFile(mode='wb', suffix='.tar.gz', delete=False) as tmp_file:
-        tmp_path = tmp_file.name
-        
-        with tarfile.open(tmp_path, 'w:gz') as tar:
-            tar.add(str(base_path), arcname=base_backup_name)
-    
     print(f"[DOWNLOAD] Serving base backup: {base_backup_name}")
     
-    return FileResponse(
-        path=tmp_path,
-        filename=f"{base_backup_name}.tar.gz",
-        media_type='application/gzip',
-        background=lambda: os.unlink(tmp_path)  # Cleanup after sending
+    return await streaming_response(
+        ["tar", "-cf", "-", "-C", str(BASE_BACKUP_DIR), base_backup_name],
+        GZIP_CMD,
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{base_backup_name}.tar.gz"'},
     )
 
 # ==============================
@@ -468,7 +848,7 @@ async def download_base_backup(base_backup_name: str):
 # ==============================
 
 @app.post("/restore/logical")
-def restore_logical(req: LogicalRestoreRequest):
+async def restore_logical(req: LogicalRestoreRequest):
     """
     Manual restore from a specific backup file.
     FIXED: Concurrent-safe with aggressive connection termination.
@@ -477,7 +857,7 @@ def restore_logical(req: LogicalRestoreRequest):
 
     backup_path = FULL_BACKUP_DIR / req.backup_file
     
-    if not backup_path.exists():
+    if not await run_fs(backup_path.exists):
         raise HTTPException(
             status_code=404, 
             detail=f"Backup file not found: {req.backup_file} in {FULL_BACKUP_DIR}"
@@ -486,41 +866,23 @@ def restore_logical(req: LogicalRestoreRequest):
     try:
         # Step 1: Force drop database with connection termination (FIXED)
         print(f"[RESTORE] Force dropping {req.db_name}...")
-        if not force_terminate_and_drop(req.db_name):
+        if not await force_terminate_and_drop(req.db_name):
             raise HTTPException(
                 status_code=409,
                 detail=f"Failed to drop database {req.db_name} after multiple attempts. Check for active connections."
             )
 
-        # Small delay to ensure cleanup
-        time.sleep(0.5)
-
         # Step 2: Create database
         print(f"[RESTORE] Creating database {req.db_name}...")
-        create_cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-c", f"CREATE DATABASE {req.db_name};",
-        ]
-        result = subprocess.run(create_cmd, check=True, capture_output=True, text=True)
+        await pg_pool.execute(f"CREATE DATABASE {quote_ident(req.db_name)}")
 
         # Step 3: Restore from backup
         print(f"[RESTORE] Restoring {req.db_name} from {req.backup_file}...")
-        restore_cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", req.db_name,
-            "-f", str(backup_path),
-        ]
-        subprocess.run(restore_cmd, check=True, capture_output=True, text=True)
+        restore_cmd = await run_fs(restore_command, req.db_name, backup_path)
+        await run_client_tool(restore_cmd, stdout=asyncio.subprocess.DEVNULL)
         
         # Step 4: Grant permissions
-        enable_db_connections(req.db_name)
+        await enable_db_connections(req.db_name)
 
         return {
             "success": True,
@@ -530,7 +892,7 @@ def restore_logical(req: LogicalRestoreRequest):
             "restored_from": req.backup_file,
             "backup_path": str(backup_path),
             "message": "Database restored successfully from specific backup",
-            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "timestamp": backup_timestamp(),
         }
 
     except subprocess.CalledProcessError as e:
@@ -543,23 +905,20 @@ def restore_logical(req: LogicalRestoreRequest):
 
 
 @app.post("/restore")
-def restore_db(req: LogicalRestoreRequest):
+async def restore_db(req: LogicalRestoreRequest):
     """Alias for restore/logical for backward compatibility"""
-    return restore_logical(req)
+    return await restore_logical(req)
 
 
 @app.post("/restore/auto")
-def auto_restore(req: BackupRequest):
+async def auto_restore(req: BackupRequest):
     """
     Auto restore from the most recent full backup.
     FIXED: Concurrent-safe with aggressive connection termination.
     """
     validate_db(req.db_name)
     
-    backup_files = sorted(
-        [f for f in FULL_BACKUP_DIR.glob(f"{req.db_name}_full_*.sql")],
-        reverse=True,
-    )
+    backup_files = await fs_listing(FULL_BACKUP_DIR, f"{req.db_name}_full_")
     
     if not backup_files:
         raise HTTPException(
@@ -567,47 +926,29 @@ def auto_restore(req: BackupRequest):
             detail=f"No backup files found for database '{req.db_name}'"
         )
     
-    latest_backup = backup_files[0]
-    backup_filename = latest_backup.name
+    backup_filename = backup_files[0]
+    latest_backup = FULL_BACKUP_DIR / backup_filename
     
     try:
         # Step 1: Force drop database with connection termination (FIXED)
         print(f"[AUTO-RESTORE] Force dropping {req.db_name}...")
-        if not force_terminate_and_drop(req.db_name):
+        if not await force_terminate_and_drop(req.db_name):
             raise HTTPException(
                 status_code=409,
                 detail=f"Failed to drop database {req.db_name} after multiple attempts. Check for active connections."
             )
 
-        # Small delay to ensure cleanup
-        time.sleep(0.5)
-
         # Step 2: Create database
         print(f"[AUTO-RESTORE] Creating database {req.db_name}...")
-        create_cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-c", f"CREATE DATABASE {req.db_name};",
-        ]
-        subprocess.run(create_cmd, check=True, capture_output=True, text=True)
+        await pg_pool.execute(f"CREATE DATABASE {quote_ident(req.db_name)}")
 
         # Step 3: Restore from backup
         print(f"[AUTO-RESTORE] Restoring {req.db_name} from {backup_filename}...")
-        restore_cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", req.db_name,
-            "-f", str(latest_backup),
-        ]
-        subprocess.run(restore_cmd, check=True, capture_output=True, text=True)
+        restore_cmd = await run_fs(restore_command, req.db_name, latest_backup)
+        await run_client_tool(restore_cmd, stdout=asyncio.subprocess.DEVNULL)
         
         # Step 4: Grant permissions
-        enable_db_connections(req.db_name)
+        await enable_db_connections(req.db_name)
 
         return {
             "success": True,
@@ -617,7 +958,7 @@ def auto_restore(req: BackupRequest):
             "restored_from": backup_filename,
             "backup_path": str(latest_backup),
             "message": "Database automatically restored from latest backup",
-            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            "timestamp": backup_timestamp(),
         }
 
     except subprocess.CalledProcessError as e:
@@ -643,10 +984,7 @@ def pitr_restore(req: PITRRestoreRequest):
             detail=f"Base backup not found: {req.base_backup_name}"
         )
 
-    wal_files = sorted(
-        [f.name for f in WAL_ARCHIVE_DIR.glob("*") if f.is_file()],
-        reverse=True,
-    )
+    wal_files = cached_listing(WAL_ARCHIVE_DIR, kind="file")
 
     return {
         "success": True,
@@ -673,42 +1011,34 @@ def pitr_restore(req: PITRRestoreRequest):
 # ==============================
 
 @app.get("/connections/{db_name}")
-def get_connections(db_name: str):
+async def get_connections(db_name: str):
     """Get active connections for a database"""
     validate_db(db_name)
     
     try:
-        cmd = [
-            "psql",
-            "-U", POSTGRES_USER,
-            "-h", POSTGRES_HOST,
-            "-p", POSTGRES_PORT,
-            "-d", "postgres",
-            "-t",
-            "-c", f"""
-                SELECT count(*) 
-                FROM pg_stat_activity 
-                WHERE datname = '{db_name}';
-            """,
-        ]
-        result = subprocess.check_output(cmd, text=True).strip()
+        counts = await connection_counts()
         
         return {
             "database": db_name,
-            "active_connections": int(result) if result else 0
+            "active_connections": counts.get(db_name, 0)
         }
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Database connection pool busy, retry shortly")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/connections/{db_name}/terminate")
-def terminate_connections(db_name: str):
+async def terminate_connections(db_name: str):
     """Terminate all connections to a database and drop it"""
     validate_db(db_name)
     
-    success = force_terminate_and_drop(db_name)
+    success = await force_terminate_and_drop(db_name)
     
     if success:
+        # Don't report the terminated sessions from a cached count
+        global _connection_counts_cache
+        _connection_counts_cache = (float("-inf"), {})
         return {
             "success": True,
             "database": db_name,
@@ -3,7 +3,11 @@ Python client library for the FastAPI MCP Backup Server.
 Provides simple interface for backup operations.
 """
 
+import asyncio
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -20,6 +24,16 @@ class MCPBackupClient:
         """
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+        
+        # Bounded keep-alive pool; idempotent requests retry on gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def _post(self, endpoint: str, data: dict) -> dict:
         """Make POST request."""
@@ -28,10 +42,10 @@ class MCPBackupClient:
         response.raise_for_status()
         return response.json()
     
-    def _get(self, endpoint: str, params: dict = None) -> dict:
+    def _get(self, endpoint: str, params: dict = None, timeout: float = None) -> dict:
         """Make GET request."""
         url = f"{self.base_url}{endpoint}"
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, timeout=timeout)
         response.raise_for_status()
         return response.json()
     
@@ -63,12 +77,23 @@ class MCPBackupClient:
         Returns:
             dict with 'databases' key containing list of database names
         """
-        response = requests.get(
-            f"{self.base_url}/servers/{server_name}/databases",
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get(f"/servers/{server_name}/databases", timeout=30)
+    
+    def list_databases_for(self, server_names: List[str]) -> Dict[str, dict]:
+        """
+        list_server_databases() for several servers at once.
+        
+        Args:
+            server_names: Names of the PostgreSQL servers
+            
+        Returns:
+            dict mapping server name to its list_server_databases() result
+        """
+        if not server_names:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(server_names)) as pool:
+            results = pool.map(self.list_server_databases, server_names)
+            return dict(zip(server_names, results))
     
     def automated_restore(
         self,
@@ -281,6 +306,96 @@ class MCPBackupClient:
         )
 
 
+class AsyncMCPBackupClient:
+    """
+    asyncio client for the FastAPI MCP Backup Server.
+    Per-server calls can be awaited together with asyncio.gather, so N
+    servers cost about one round trip instead of N.
+    """
+    
+    def __init__(self, base_url: str = "http://localhost:8001"):
+        """
+        Initialize the client.
+        
+        Args:
+            base_url: Base URL of the FastAPI server
+        """
+        # Imported here so MCPBackupClient users don't need httpx
+        import httpx
+
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=None,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    
+    async def __aenter__(self) -> "AsyncMCPBackupClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+    
+    async def _post(self, endpoint: str, data: dict) -> dict:
+        """Make POST request."""
+        response = await self._client.post(endpoint, json=data)
+        response.raise_for_status()
+        return response.json()
+    
+    async def _get(self, endpoint: str, params: dict = None, timeout: float = None) -> dict:
+        """Make GET request."""
+        response = await self._client.get(endpoint, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """Check health of all MCP servers."""
+        return await self._get("/health")
+    
+    async def list_servers(self) -> Dict[str, Any]:
+        """List all available MCP servers."""
+        return await self._get("/servers")
+    
+    async def list_server_databases(self, server_name: str) -> dict:
+        """List all databases for a specific server."""
+        return await self._get(f"/servers/{server_name}/databases", timeout=30)
+    
+    async def list_databases_for(self, server_names: List[str]) -> Dict[str, dict]:
+        """list_server_databases() for several servers concurrently."""
+        results = await asyncio.gather(
+            *(self.list_server_databases(name) for name in server_names)
+        )
+        return dict(zip(server_names, results))
+    
+    async def list_backups(
+        self,
+        server_name: str,
+        db_name: str,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """List backups for a database on a specific server."""
+        return await self._post(
+            f"/servers/{server_name}/backups/list",
+            {"db_name": db_name, "limit": limit}
+        )
+    
+    async def trigger_backup(
+        self,
+        server_name: str,
+        db_name: str,
+        backup_type: str = "full"
+    ) -> Dict[str, Any]:
+        """Trigger a backup on a specific server."""
+        return await self._post(
+            f"/servers/{server_name}/backups/trigger",
+            {"db_name": db_name, "backup_type": backup_type}
+        )
+
+
 # ============================================================================
 # Example Usage
 # ============================================================================
@@ -313,11 +428,9 @@ def example_usage():
     print("\n3. List Databases")
     print("-" * 70)
     try:
-        for server in servers['servers']:
-            if server['connected']:
-                server_name = server['name']
-                databases = client.list_server_databases(server_name)
-                print(f"{server_name}: {', '.join(databases.get('databases', []))}")
+        connected = [server['name'] for server in servers['servers'] if server['connected']]
+        for server_name, databases in client.list_databases_for(connected).items():
+            print(f"{server_name}: {', '.join(databases.get('databases', []))}")
     except Exception as e:
         print(f"Error: {e}")
     
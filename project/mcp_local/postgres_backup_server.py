@@ -7,16 +7,25 @@ Implements the MCP protocol using JSON-RPC over stdio transport.
 """
 
 import asyncio
-import json
 import sys
 import logging
-import argparse
+import bisect
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 import subprocess
 import os
 
+import orjson
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import ConnectionPool
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +35,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Worker count for parallel pg_dump -F d / pg_restore
+PARALLEL_JOBS = str(os.cpu_count() or 4)
+
+# Seconds a successful health probe is reused
+HEALTH_CACHE_TTL = 1.0
+
+# Tool calls running at once (each may hold a pg_dump/restore and a pooled connection)
+TOOL_WORKERS = 4
+
+
 # ============================================================================
 # PostgreSQL Connection Configuration
 # ============================================================================
@@ -33,6 +52,15 @@ logger = logging.getLogger(__name__)
 class PostgresConfig:
     """PostgreSQL connection configuration."""
     
+    __slots__ = (
+        "server_name", "host", "port", "database", "user", "password",
+        "pooler_host", "pooler_port", "backup_dir",
+    )
+    
+    # (host, port, user, database) -> pool, shared by every config for that server
+    _pools: Dict[tuple, ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+    
     def __init__(self, server_name: str):
         self.server_name = server_name
         
@@ -44,13 +72,76 @@ class PostgresConfig:
         self.user = os.getenv(f"{prefix}_USER", "postgres")
         self.password = os.getenv(f"{prefix}_PASSWORD", "")
         
+        # Optional PgBouncer (transaction pooling) for the short control queries
+        self.pooler_host = os.getenv(f"{prefix}_PGBOUNCER_HOST")
+        self.pooler_port = int(os.getenv(f"{prefix}_PGBOUNCER_PORT", "6432"))
+        
         # Backup storage
         self.backup_dir = Path(os.getenv(f"{prefix}_BACKUP_DIR", f"./backups/{server_name}"))
         self.backup_dir.mkdir(parents=True, exist_ok=True)
     
-    def get_connection_string(self) -> str:
-        """Get PostgreSQL connection string."""
-        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+    def _endpoint(self, use_pooler: bool) -> tuple:
+        """(host, port) to connect to; the pooler only if one is configured."""
+        if use_pooler and self.pooler_host:
+            return self.pooler_host, self.pooler_port
+        return self.host, self.port
+    
+    def get_connection_string(self, use_pooler: bool = False) -> str:
+        """
+        Get PostgreSQL connection string.
+        
+        use_pooler selects PgBouncer (<PREFIX>_PGBOUNCER_HOST/_PORT) when
+        configured. Only short queries belong there (SELECT 1,
+        pg_stat_activity, CREATE/DROP DATABASE). pg_dump, pg_restore and
+        psql -f rely on session state that transaction pooling does not
+        keep, so they always connect directly.
+        """
+        host, port = self._endpoint(use_pooler)
+        return f"postgresql://{self.user}:{self.password}@{host}:{port}/{self.database}"
+    
+    def get_pool(self, database: Optional[str] = None) -> ConnectionPool:
+        """
+        Get the connection pool for a database (defaults to self.database).
+        Used for the short control queries, through PgBouncer when one is
+        configured; pg_dump and psql -f restores still run as client tools.
+        """
+        database = database or self.database
+        host, port = self._endpoint(use_pooler=True)
+        key = (host, port, self.user, database)
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+        # Tool threads race here on first use; only one may open the pool
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                conninfo = make_conninfo(
+                    host=host,
+                    port=port,
+                    user=self.user,
+                    password=self.password or None,
+                    dbname=database,
+                )
+                # autocommit: CREATE/DROP DATABASE cannot run inside a transaction.
+                # Idle connections live long enough to survive the gaps between
+                # bursts, and are recycled every 30 minutes.
+                # A tool call holds at most one connection, so TOOL_WORKERS covers
+                # every concurrent call; two stay open for the common case
+                pool = ConnectionPool(
+                    conninfo,
+                    min_size=2,
+                    max_size=TOOL_WORKERS,
+                    kwargs={
+                        "autocommit": True,
+                        "connect_timeout": 5,
+                        # Server-side prepared statements don't survive transaction pooling
+                        "prepare_threshold": None if host == self.pooler_host else 5,
+                    },
+                    max_idle=120,
+                    max_lifetime=1800,
+                )
+                self._pools[key] = pool
+        return pool
     
     def get_pg_dump_env(self) -> Dict[str, str]:
         """Get environment variables for pg_dump."""
@@ -65,69 +156,196 @@ class PostgresConfig:
         return env
 
 
+@lru_cache(maxsize=None)
+def get_config(server_name: str) -> PostgresConfig:
+    """Parsed config for a server, shared by everything in the process."""
+    return PostgresConfig(server_name)
+
+
 # ============================================================================
 # Backup Manager
 # ============================================================================
 
+def _timestamp_epoch(timestamp: Optional[str]) -> float:
+    """ISO8601 timestamp as epoch seconds; unparseable ones sort first."""
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return float("-inf")
+
+
 class BackupManager:
     """Manages PostgreSQL backups and restores."""
     
+    __slots__ = (
+        "config", "metadata_file", "legacy_metadata_file", "backups",
+        "_by_db", "_epochs", "_lock", "_health_probe",
+    )
+    
     def __init__(self, config: PostgresConfig):
         self.config = config
-        self.metadata_file = self.config.backup_dir / "metadata.json"
+        # Append-only log, one backup record per line
+        self.metadata_file = self.config.backup_dir / "metadata.jsonl"
+        # Whole-file JSON written by earlier versions; read once to migrate
+        self.legacy_metadata_file = self.config.backup_dir / "metadata.json"
         self.backups = self._load_metadata()
+        self._by_db, self._epochs = self._build_index()
+        # Tools run on worker threads; serializes index and log updates
+        self._lock = threading.Lock()
+        # (time.monotonic() of last successful probe, server version)
+        self._health_probe = (float("-inf"), None)
     
     def _load_metadata(self) -> Dict[str, Any]:
         """Load backup metadata."""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load metadata: {e}")
-        return {"backups": []}
+        if not self.metadata_file.exists():
+            return self._migrate_legacy_metadata()
+        
+        records: Dict[Any, Dict[str, Any]] = {}
+        lines = 0
+        corrupt = False
+        try:
+            with open(self.metadata_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    lines += 1
+                    try:
+                        record = orjson.loads(line)
+                    except ValueError:
+                        # Torn final line from a crash mid-append
+                        logger.warning(f"Skipping corrupt metadata line {lines}")
+                        corrupt = True
+                        continue
+                    # Later lines for the same id supersede earlier ones
+                    records[record.get("id", lines)] = record
+        except Exception as e:
+            logger.error(f"Failed to load metadata: {e}")
+            return {"backups": []}
+        
+        metadata = {"backups": list(records.values())}
+        # Rewrite when mostly superseded lines, or so the next append
+        # doesn't land on the end of a torn line
+        if corrupt or lines > 2 * len(records):
+            self._compact_metadata(metadata)
+        return metadata
     
-    def _save_metadata(self):
-        """Save backup metadata."""
+    def _migrate_legacy_metadata(self) -> Dict[str, Any]:
+        """Load metadata.json, if any, and rewrite it as the append-only log."""
+        if not self.legacy_metadata_file.exists():
+            return {"backups": []}
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.backups, f, indent=2, default=str)
+            metadata = orjson.loads(self.legacy_metadata_file.read_bytes())
+        except Exception as e:
+            logger.error(f"Failed to load metadata: {e}")
+            return {"backups": []}
+        self._compact_metadata(metadata)
+        return metadata
+    
+    def _build_index(self) -> tuple:
+        """
+        Index backups by db_name, each list sorted by timestamp (oldest first),
+        alongside the matching epoch-seconds lists. Timestamps are parsed once
+        here rather than on every lookup.
+        """
+        by_db: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        epochs: Dict[str, List[float]] = defaultdict(list)
+        
+        keyed = sorted(
+            ((_timestamp_epoch(b.get("timestamp")), b) for b in self.backups.get("backups", [])),
+            key=lambda pair: pair[0],
+        )
+        for epoch, b in keyed:
+            by_db[b.get("db_name")].append(b)
+            epochs[b.get("db_name")].append(epoch)
+        return by_db, epochs
+    
+    def _add_backup(self, backup_metadata: Dict[str, Any]):
+        """Record a completed backup in the metadata and the db_name index."""
+        db_name = backup_metadata["db_name"]
+        epoch = _timestamp_epoch(backup_metadata["timestamp"])
+        
+        with self._lock:
+            self.backups.setdefault("backups", []).append(backup_metadata)
+            
+            i = bisect.bisect_right(self._epochs[db_name], epoch)
+            self._epochs[db_name].insert(i, epoch)
+            self._by_db[db_name].insert(i, backup_metadata)
+            
+            self._append_metadata(backup_metadata)
+    
+    def _closest_backup(self, db_name: str, target_timestamp: str) -> Optional[Dict[str, Any]]:
+        """Backup of db_name whose timestamp is closest to target_timestamp."""
+        epochs = self._epochs.get(db_name)
+        if not epochs:
+            return None
+        
+        target = datetime.fromisoformat(target_timestamp.replace('Z', '+00:00')).timestamp()
+        i = bisect.bisect_left(epochs, target)
+        
+        # Closest is one of the two neighbours of the insertion point
+        if i == len(epochs):
+            return self._by_db[db_name][i - 1]
+        if i > 0 and target - epochs[i - 1] <= epochs[i] - target:
+            return self._by_db[db_name][i - 1]
+        return self._by_db[db_name][i]
+    
+    def _append_metadata(self, record: Dict[str, Any]):
+        """Append one backup record to the metadata log (O(1), crash-safe)."""
+        try:
+            with open(self.metadata_file, 'ab') as f:
+                f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                f.flush()
+                os.fsync(f.fileno())
         except Exception as e:
             logger.error(f"Failed to save metadata: {e}")
     
+    def _compact_metadata(self, metadata: Dict[str, Any]):
+        """Atomically replace the metadata log with one line per live record."""
+        tmp_file = self.metadata_file.with_suffix(".jsonl.tmp")
+        try:
+            with open(tmp_file, 'wb') as f:
+                for record in metadata.get("backups", []):
+                    f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.metadata_file)
+        except Exception as e:
+            logger.error(f"Failed to compact metadata: {e}")
+    
     def _generate_backup_id(self, backup_type: str) -> str:
         """Generate unique backup ID."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Microseconds: backups of different databases may now start in the same second
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         return f"{backup_type}_{timestamp}"
     
     def list_backups(self, db_name: str, limit: int = 50) -> List[Dict[str, Any]]:
         """List backups for a database."""
-        db_backups = [
-            b for b in self.backups.get("backups", [])
-            if b.get("db_name") == db_name
-        ]
-        
-        # Sort by timestamp (newest first)
-        db_backups.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        if limit <= 0:
+            return []
         
-        return db_backups[:limit]
+        # Index is oldest first; return the newest `limit`, newest first
+        db_backups = self._by_db.get(db_name, [])
+        return db_backups[-limit:][::-1]
     
     def trigger_full_backup(self, db_name: str) -> Dict[str, Any]:
         """Trigger a full backup."""
         try:
             backup_id = self._generate_backup_id("full")
-            backup_file = self.config.backup_dir / f"{backup_id}.sql"
+            backup_file = self.config.backup_dir / backup_id
             
             logger.info(f"Starting full backup for {db_name}...")
             
-            # Run pg_dump
+            # Run pg_dump: directory format, one file per table, so both the
+            # dump and pg_restore run PARALLEL_JOBS workers
             cmd = [
                 "pg_dump",
                 "-h", self.config.host,
                 "-p", str(self.config.port),
                 "-U", self.config.user,
                 "-d", db_name,
-                "-F", "p",  # Plain text format
+                "-F", "d",
+                "-j", PARALLEL_JOBS,
+                "-Z", "6",
                 "-f", str(backup_file)
             ]
             
@@ -141,8 +359,8 @@ class BackupManager:
             if result.returncode != 0:
                 raise Exception(f"pg_dump failed: {result.stderr}")
             
-            # Get file size
-            file_size = backup_file.stat().st_size
+            # Get dump size (sum of the directory's files)
+            file_size = sum(p.stat().st_size for p in backup_file.rglob("*") if p.is_file())
             
             # Create metadata
             backup_metadata = {
@@ -156,8 +374,7 @@ class BackupManager:
             }
             
             # Save metadata
-            self.backups.setdefault("backups", []).append(backup_metadata)
-            self._save_metadata()
+            self._add_backup(backup_metadata)
             
             logger.info(f"Full backup completed: {backup_id}")
             
@@ -181,7 +398,7 @@ class BackupManager:
             # For simplicity, we'll do a full backup labeled as incremental
             # In production, you'd use WAL archiving or pg_basebackup
             backup_id = self._generate_backup_id("incremental")
-            backup_file = self.config.backup_dir / f"{backup_id}.sql"
+            backup_file = self.config.backup_dir / f"{backup_id}.dump"
             
             logger.info(f"Starting incremental backup for {db_name}...")
             
@@ -198,7 +415,8 @@ class BackupManager:
                 "-p", str(self.config.port),
                 "-U", self.config.user,
                 "-d", db_name,
-                "-F", "p",
+                "-F", "c",
+                "-Z", "6",
                 "-f", str(backup_file)
             ]
             
@@ -225,8 +443,7 @@ class BackupManager:
                 "status": "completed"
             }
             
-            self.backups.setdefault("backups", []).append(backup_metadata)
-            self._save_metadata()
+            self._add_backup(backup_metadata)
             
             logger.info(f"Incremental backup completed: {backup_id}")
             
@@ -263,22 +480,8 @@ class BackupManager:
                         backup = b
                         break
             elif target_timestamp:
-                # Find closest backup before target timestamp
-                target_dt = datetime.fromisoformat(target_timestamp.replace('Z', '+00:00'))
-                candidates = [
-                    b for b in self.backups.get("backups", [])
-                    if b.get("db_name") == db_name
-                ]
-                
-                # Sort by how close they are to target
-                candidates.sort(
-                    key=lambda x: abs(
-                        (datetime.fromisoformat(x.get("timestamp", "")) - target_dt).total_seconds()
-                    )
-                )
-                
-                if candidates:
-                    backup = candidates[0]
+                # Find closest backup to target timestamp
+                backup = self._closest_backup(db_name, target_timestamp)
             else:
                 # Use most recent backup
                 backups = self.list_backups(db_name, limit=1)
@@ -296,49 +499,36 @@ class BackupManager:
             
             # Drop and recreate database (WARNING: destructive!)
             # In production, you'd want more safeguards
-            drop_cmd = [
-                "psql",
-                "-h", self.config.host,
-                "-p", str(self.config.port),
-                "-U", self.config.user,
-                "-d", "postgres",
-                "-c", f"DROP DATABASE IF EXISTS {db_name};"
-            ]
-            
-            subprocess.run(
-                drop_cmd,
-                env=self.config.get_pg_dump_env(),
-                capture_output=True
-            )
-            
-            create_cmd = [
-                "psql",
-                "-h", self.config.host,
-                "-p", str(self.config.port),
-                "-U", self.config.user,
-                "-d", "postgres",
-                "-c", f"CREATE DATABASE {db_name};"
-            ]
-            
-            result = subprocess.run(
-                create_cmd,
-                env=self.config.get_pg_dump_env(),
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"Failed to create database: {result.stderr}")
+            # Identifiers cannot be bound as parameters, so quote them instead
+            db_ident = sql.Identifier(db_name)
+            try:
+                with self.config.get_pool("postgres").connection() as conn:
+                    conn.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(db_ident))
+                    conn.execute(sql.SQL("CREATE DATABASE {}").format(db_ident))
+            except Exception as e:
+                raise Exception(f"Failed to create database: {e}")
             
-            # Restore from backup
-            restore_cmd = [
-                "psql",
-                "-h", self.config.host,
-                "-p", str(self.config.port),
-                "-U", self.config.user,
-                "-d", db_name,
-                "-f", str(backup_file)
-            ]
+            # Restore from backup: archives (custom-format files, directory
+            # dumps) in parallel with pg_restore, older plain .sql dumps via psql
+            if backup_file.suffix == ".sql":
+                restore_cmd = [
+                    "psql",
+                    "-h", self.config.host,
+                    "-p", str(self.config.port),
+                    "-U", self.config.user,
+                    "-d", db_name,
+                    "-f", str(backup_file)
+                ]
+            else:
+                restore_cmd = [
+                    "pg_restore",
+                    "-h", self.config.host,
+                    "-p", str(self.config.port),
+                    "-U", self.config.user,
+                    "-j", PARALLEL_JOBS,
+                    "-d", db_name,
+                    str(backup_file)
+                ]
             
             result = subprocess.run(
                 restore_cmd,
@@ -385,39 +575,39 @@ class BackupManager:
         }
     
     def health_check(self) -> Dict[str, Any]:
-        """Perform health check."""
+        """
+        Perform health check.
+        A successful database probe is reused for HEALTH_CACHE_TTL seconds,
+        so orchestrators polling at several Hz cost one query per interval;
+        the backup count is always current.
+        """
         try:
-            # Test PostgreSQL connection
-            cmd = [
-                "psql",
-                "-h", self.config.host,
-                "-p", str(self.config.port),
-                "-U", self.config.user,
-                "-d", self.config.database,
-                "-c", "SELECT 1;"
-            ]
+            checked_at, version = self._health_probe
+            now = time.monotonic()
+            if now - checked_at >= HEALTH_CACHE_TTL:
+                # Test PostgreSQL connection
+                # Probe through the maintenance database: a pool held open on
+                # config.database would make DROP DATABASE fail on restore.
+                # That database is checked by name instead
+                database = self.config.database
+                with self.config.get_pool("postgres").connection(timeout=5) as conn:
+                    version, reachable = conn.execute(
+                        "SELECT version(), EXISTS ("
+                        " SELECT 1 FROM pg_database WHERE datname = %s"
+                        " AND datallowconn AND has_database_privilege(datname, 'CONNECT'))",
+                        (database,),
+                    ).fetchone()
+                if not reachable:
+                    raise Exception(f"Database {database} does not exist or does not accept connections")
+                self._health_probe = (now, version)
             
-            result = subprocess.run(
-                cmd,
-                env=self.config.get_pg_dump_env(),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode == 0:
-                return {
-                    "status": "healthy",
-                    "server": self.config.server_name,
-                    "postgres_version": "connected",
-                    "backup_dir": str(self.config.backup_dir),
-                    "total_backups": len(self.backups.get("backups", []))
-                }
-            else:
-                return {
-                    "status": "unhealthy",
-                    "error": result.stderr
-                }
+            return {
+                "status": "healthy",
+                "server": self.config.server_name,
+                "postgres_version": version,
+                "backup_dir": str(self.config.backup_dir),
+                "total_backups": len(self.backups.get("backups", []))
+            }
                 
         except Exception as e:
             return {
@@ -430,13 +620,84 @@ class BackupManager:
 # MCP Server Implementation
 # ============================================================================
 
+# Bytes requested from stdin per read; a burst of requests arrives in one read
+STDIN_READ_SIZE = 1 << 16
+
+
+def _dumps(obj: Any) -> bytes:
+    """Compact JSON-RPC message encoding (orjson emits UTF-8 bytes directly)."""
+    return orjson.dumps(obj, default=str)
+
+
+class ToolError(Exception):
+    """
+    Expected failure answered with a JSON-RPC error (bad arguments, unknown
+    tool). Handled quietly, unlike unexpected exceptions, which are logged.
+    """
+    
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+# JSON Schema "type" -> Python types accepted for it (bool is not an integer here)
+_SCHEMA_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+}
+
+
+def _compile_validator(tool_name: str, schema: Dict[str, Any]):
+    """
+    Turn a tool's inputSchema (required keys + typed properties, the subset
+    the tool definitions use) into a function that checks arguments and
+    raises ToolError. The schema is walked once here, not on every call.
+    """
+    required = tuple(schema.get("required", ()))
+    typed = tuple(
+        (name, _SCHEMA_TYPES[prop["type"]], prop["type"])
+        for name, prop in schema.get("properties", {}).items()
+        if prop.get("type") in _SCHEMA_TYPES
+    )
+    
+    def validate(arguments: Any):
+        if not isinstance(arguments, dict):
+            raise ToolError(-32602, f"Invalid arguments for {tool_name}: expected an object")
+        for name in required:
+            if name not in arguments:
+                raise ToolError(-32602, f"Invalid arguments for {tool_name}: '{name}' is required")
+        for name, types, type_name in typed:
+            value = arguments.get(name)
+            if value is not None and (
+                not isinstance(value, types) or (isinstance(value, bool) and bool not in types)
+            ):
+                raise ToolError(-32602, f"Invalid arguments for {tool_name}: '{name}' must be {type_name}")
+    
+    return validate
+
+
 class MCPServer:
     """MCP Server for PostgreSQL backups."""
     
+    # Attribute access on the per-request path is a slot lookup, not a dict probe
+    __slots__ = (
+        "server_name", "tools", "_backup_manager", "_backup_manager_lock",
+        "_method_dispatch", "_tool_dispatch", "_response_dispatch", "_validators",
+        "_tool_executor", "_flush_scheduled",
+        "_initialize_result", "_tools_list_suffix",
+    )
+    
     def __init__(self, server_name: str):
         self.server_name = server_name
-        self.config = PostgresConfig(server_name)
-        self.backup_manager = BackupManager(self.config)
+        
+        # Built by the first tool call; initialize and tools/list never need it
+        self._backup_manager: Optional[BackupManager] = None
+        self._backup_manager_lock = threading.Lock()
         
         # Tool definitions
         self.tools = [
@@ -537,6 +798,125 @@ class MCPServer:
                 }
             }
         ]
+        
+        # Built once; handle_request/call_tool do a single dict lookup.
+        # tools/list and tools/call are answered by respond() directly, see
+        # _response_dispatch
+        self._method_dispatch = {
+            "initialize": self._rpc_initialize,
+        }
+        self._tool_dispatch = {
+            "list_backups": self._tool_list_backups,
+            "trigger_full_backup": self._tool_trigger_full_backup,
+            "trigger_incremental_backup": self._tool_trigger_incremental_backup,
+            "restore_database": self._tool_restore_database,
+            "enable_schedules": self._tool_enable_schedules,
+            "health": self._tool_health,
+        }
+        
+        # Argument checks compiled from each tool's inputSchema
+        self._validators = {
+            tool["name"]: _compile_validator(tool["name"], tool["inputSchema"])
+            for tool in self.tools
+        }
+        
+        # Set while a stdout flush is queued; see _schedule_flush()
+        self._flush_scheduled = False
+        
+        # Bounded, so a burst of tool calls can't start unlimited dumps at once
+        self._tool_executor = ThreadPoolExecutor(
+            max_workers=TOOL_WORKERS,
+            thread_name_prefix="mcp-tool",
+        )
+        
+        # Constant results, shared by every response (never mutated)
+        self._initialize_result = {
+            "protocolVersion": "2024-11-05",
+            "serverInfo": {
+                "name": f"postgres-backup-{self.server_name}",
+                "version": "1.0.0"
+            },
+            "capabilities": {
+                "tools": {}
+            }
+        }
+        # self.tools never changes, so tools/list is serialized once;
+        # only the request id is filled in per call
+        self._tools_list_suffix = b',"result":{"tools":' + _dumps(self.tools) + b'}}'
+        
+        # Methods respond() serializes itself; the rest go through handle_request
+        self._response_dispatch = {
+            "tools/list": self._tools_list_response,
+            "tools/call": self._tools_call_response,
+        }
+    
+    async def _tools_list_response(self, request: Dict[str, Any]) -> bytes:
+        """Serialized tools/list response: cached bytes around the request id."""
+        return b'{"jsonrpc":"2.0","id":' + _dumps(request.get("id")) + self._tools_list_suffix
+    
+    async def _tools_call_response(self, request: Dict[str, Any]) -> bytes:
+        """
+        Serialized tools/call response. The result is encoded once and
+        spliced into the envelope as the text content, instead of being
+        embedded in dicts and walked a second time by the outer encode.
+        """
+        request_id = request.get("id")
+        params = request.get("params", {})
+        
+        try:
+            result = await self.call_tool(params.get("name"), params.get("arguments", {}))
+        except ToolError as e:
+            return _dumps(self._error(request_id, e.code, e.message))
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            return _dumps(self._error(request_id, -32603, str(e)))
+        
+        return (
+            b'{"jsonrpc":"2.0","id":' + _dumps(request_id)
+            + b',"result":{"content":[{"type":"text","text":'
+            + _dumps(_dumps(result).decode())
+            + b'}]}}'
+        )
+    
+    async def respond_line(self, line: bytes) -> bytes:
+        """Handle one line from stdin: a JSON-RPC request or batch array."""
+        try:
+            message = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            return _dumps(self._error(None, -32700, f"Parse error: {e}"))
+        
+        if isinstance(message, list):
+            if not message:
+                return _dumps(self._error(None, -32600, "Invalid Request: empty batch"))
+            responses = await asyncio.gather(*map(self.respond, message))
+            return b"[" + b",".join(responses) + b"]"
+        
+        return await self.respond(message)
+    
+    async def respond(self, request: Dict[str, Any]) -> bytes:
+        """Handle a JSON-RPC request and return the serialized response."""
+        if not isinstance(request, dict):
+            return _dumps(self._error(None, -32600, "Invalid Request"))
+        
+        method = request.get("method")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Received request: {method}")
+        responder = self._response_dispatch.get(method) if isinstance(method, str) else None
+        if responder is not None:
+            return await responder(request)
+        return _dumps(await self.handle_request(request))
+    
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        """JSON-RPC error response."""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {
+                "code": code,
+                "message": message
+            }
+        }
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle JSON-RPC request."""
@@ -545,132 +925,165 @@ class MCPServer:
         request_id = request.get("id")
         
         try:
-            if method == "initialize":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "serverInfo": {
-                            "name": f"postgres-backup-{self.server_name}",
-                            "version": "1.0.0"
-                        },
-                        "capabilities": {
-                            "tools": {}
-                        }
-                    }
-                }
-            
-            elif method == "tools/list":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "tools": self.tools
-                    }
-                }
+            handler = self._method_dispatch.get(method)
+            if handler is None:
+                return self._error(request_id, -32601, f"Method not found: {method}")
             
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                result = await self.call_tool(tool_name, arguments)
-                
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": json.dumps(result, default=str)
-                            }
-                        ]
-                    }
-                }
-            
-            else:
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Method not found: {method}"
-                    }
-                }
-                
-        except Exception as e:
-            logger.error(f"Error handling request: {e}")
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "error": {
-                    "code": -32603,
-                    "message": str(e)
-                }
+                "result": await handler(params)
             }
+        
+        except ToolError as e:
+            return self._error(request_id, e.code, e.message)
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+            return self._error(request_id, -32603, str(e))
+    
+    # ------------------------------------------------------------------------
+    # JSON-RPC methods: params -> result
+    # ------------------------------------------------------------------------
+    
+    async def _rpc_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._initialize_result
+    
+    @property
+    def config(self) -> PostgresConfig:
+        return get_config(self.server_name)
+    
+    @property
+    def backup_manager(self) -> BackupManager:
+        # Tool workers may race here on the first burst of calls
+        if self._backup_manager is None:
+            with self._backup_manager_lock:
+                if self._backup_manager is None:
+                    self._backup_manager = BackupManager(self.config)
+        return self._backup_manager
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a tool."""
-        if tool_name == "list_backups":
-            db_name = arguments["db_name"]
-            limit = arguments.get("limit", 50)
-            return self.backup_manager.list_backups(db_name, limit)
-        
-        elif tool_name == "trigger_full_backup":
-            db_name = arguments["db_name"]
-            return self.backup_manager.trigger_full_backup(db_name)
-        
-        elif tool_name == "trigger_incremental_backup":
-            db_name = arguments["db_name"]
-            return self.backup_manager.trigger_incremental_backup(db_name)
-        
-        elif tool_name == "restore_database":
-            db_name = arguments["db_name"]
-            backup_id = arguments.get("backup_id")
-            target_timestamp = arguments.get("target_timestamp")
-            return self.backup_manager.restore_database(db_name, backup_id, target_timestamp)
-        
-        elif tool_name == "enable_schedules":
-            incremental = arguments.get("incremental_every", "PT2M")
-            full_cron = arguments.get("full_cron", "0 3 * * 0")
-            return self.backup_manager.enable_schedules(incremental, full_cron)
-        
-        elif tool_name == "health":
-            return self.backup_manager.health_check()
-        
-        else:
-            raise Exception(f"Unknown tool: {tool_name}")
+        handler = self._tool_dispatch.get(tool_name)
+        if handler is None:
+            raise ToolError(-32602, f"Unknown tool: {tool_name}")
+        self._validators[tool_name](arguments)
+        # BackupManager blocks (pg_dump, restores, queries); keep the loop free
+        # so pipelined requests run concurrently
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._tool_executor, handler, arguments)
+    
+    # ------------------------------------------------------------------------
+    # Tools: arguments -> result
+    # ------------------------------------------------------------------------
+    
+    def _tool_list_backups(self, arguments: Dict[str, Any]):
+        return self.backup_manager.list_backups(
+            arguments["db_name"],
+            arguments.get("limit", 50)
+        )
+    
+    def _tool_trigger_full_backup(self, arguments: Dict[str, Any]):
+        return self.backup_manager.trigger_full_backup(arguments["db_name"])
+    
+    def _tool_trigger_incremental_backup(self, arguments: Dict[str, Any]):
+        return self.backup_manager.trigger_incremental_backup(arguments["db_name"])
+    
+    def _tool_restore_database(self, arguments: Dict[str, Any]):
+        return self.backup_manager.restore_database(
+            arguments["db_name"],
+            arguments.get("backup_id"),
+            arguments.get("target_timestamp")
+        )
+    
+    def _tool_enable_schedules(self, arguments: Dict[str, Any]):
+        return self.backup_manager.enable_schedules(
+            arguments.get("incremental_every", "PT2M"),
+            arguments.get("full_cron", "0 3 * * 0")
+        )
+    
+    def _tool_health(self, arguments: Dict[str, Any]):
+        return self.backup_manager.health_check()
+    
+    async def _serve_line(self, line: bytes):
+        """
+        Answer one request line as soon as it is done. Replies may go out
+        in any order (clients match them by id); ones finishing in the same
+        loop iteration still share a flush.
+        """
+        try:
+            response = await self.respond_line(line)
+            sys.stdout.buffer.write(response + b"\n")
+            self._schedule_flush()
+        except Exception as e:
+            logger.error(f"Error in main loop: {e}")
+    
+    def _schedule_flush(self):
+        """
+        Flush stdout once the current loop iteration is done, so replies
+        finishing together share a single write(2).
+        """
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_stdout)
+    
+    def _flush_stdout(self):
+        self._flush_scheduled = False
+        try:
+            sys.stdout.buffer.flush()
+        except Exception as e:
+            logger.error(f"Error in main loop: {e}")
     
     async def run(self):
         """Run the MCP server (stdio mode)."""
         logger.info(f"Starting MCP server: {self.server_name}")
         
-        # Read from stdin, write to stdout
-        reader = asyncio.StreamReader()
-        protocol = asyncio.StreamReaderProtocol(reader)
-        await asyncio.get_event_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+        # Read stdin straight from the selector: each wakeup reads whatever
+        # has arrived and starts one task per complete line, so a slow tool
+        # call never holds back replies to the requests read alongside it
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        # A terminal's stdin and stdout share one open file description, so
+        # the original mode is put back for stdout and the parent shell
+        was_blocking = os.get_blocking(fd)
+        os.set_blocking(fd, False)
+        stdin_closed = loop.create_future()
+        in_flight = set()
+        pending = b""
         
-        while True:
+        def on_readable():
+            nonlocal pending
             try:
-                # Read JSON-RPC request
-                line = await reader.readline()
-                if not line:
-                    break
-                
-                request = json.loads(line.decode())
-                logger.debug(f"Received request: {request.get('method')}")
-                
-                # Handle request
-                response = await self.handle_request(request)
-                
-                # Write response
-                sys.stdout.write(json.dumps(response) + "\n")
-                sys.stdout.flush()
-                
-            except Exception as e:
+                data = os.read(fd, STDIN_READ_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
                 logger.error(f"Error in main loop: {e}")
-                break
+                data = b""
+            
+            if data:
+                *lines, pending = (pending + data).split(b"\n")
+            else:
+                lines, pending = [pending], b""
+                loop.remove_reader(fd)
+                stdin_closed.set_result(None)
+            
+            for line in lines:
+                if line.strip():
+                    task = loop.create_task(self._serve_line(line))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+        
+        loop.add_reader(fd, on_readable)
+        try:
+            await stdin_closed
+        finally:
+            loop.remove_reader(fd)
+            os.set_blocking(fd, was_blocking)
+        
+        # Answer everything already received before exiting
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        self._flush_stdout()
         
         logger.info(f"MCP server stopped: {self.server_name}")
 
@@ -679,19 +1092,44 @@ class MCPServer:
 # Main Entry Point
 # ============================================================================
 
+USAGE = (
+    "usage: postgres_backup_server.py --server-name NAME\n"
+    "  NAME  Server name (e.g., PG1, PG2); also the <NAME>_* environment prefix"
+)
+
+
+def parse_server_name(argv: List[str]) -> str:
+    """
+    Get --server-name from argv (the only option, so no argparse at startup).
+    Exits with the usage message if it is missing or not a valid
+    environment-variable prefix.
+    """
+    name = None
+    args = iter(argv)
+    for arg in args:
+        if arg in ("-h", "--help"):
+            print(USAGE)
+            sys.exit(0)
+        if arg == "--server-name":
+            name = next(args, None)
+        elif arg.startswith("--server-name="):
+            name = arg.split("=", 1)[1]
+        else:
+            sys.exit(f"{USAGE}\nerror: unrecognized argument: {arg}")
+    
+    if not name:
+        sys.exit(f"{USAGE}\nerror: --server-name is required")
+    if not name.replace("_", "").isalnum():
+        sys.exit(f"{USAGE}\nerror: invalid server name: {name!r}")
+    return name
+
+
 def main():
     """Main entry point."""
-    parser = argparse.ArgumentParser(description="PostgreSQL Backup MCP Server")
-    parser.add_argument(
-        "--server-name",
-        required=True,
-        help="Server name (e.g., PG1, PG2)"
-    )
-    
-    args = parser.parse_args()
+    server_name = parse_server_name(sys.argv[1:])
     
     # Create and run server
-    server = MCPServer(args.server_name)
+    server = MCPServer(server_name)
     
     try:
         asyncio.run(server.run())
@@ -6,32 +6,69 @@ COMPLETE VERSION - AUTOMATIC PITR RESTORE (CORRECTED)
 """
 
 import sys
+import asyncio
 import json
 import time
 import os
+import atexit
+import errno
+import fcntl
+import mmap
+import grp
+import pwd
+import queue
+import threading
 import shutil
 import subprocess
-import requests
+import orjson
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional  # ✅ portable union types
 
-try:
-    import ollama
-except ImportError:
-    print("❌ Install Ollama SDK: pip install ollama")
-    sys.exit(1)
+
+# ollama (and the httpx stack under it), requests and psycopg are imported on
+# first use, so commands that never reach them don't pay their import time
+
+@lru_cache(maxsize=None)
+def _ollama():
+    try:
+        import ollama
+    except ImportError:
+        print("❌ Install Ollama SDK: pip install ollama")
+        sys.exit(1)
+    return ollama
+
+
+@lru_cache(maxsize=None)
+def _psycopg():
+    import psycopg
+
+    return psycopg
 
 # ======================= CONFIG =======================
 
 FASTAPI = "http://localhost:8001"
 MODEL = "llama3"
 
+# Keep the model (and the system prompt's KV cache) loaded between commands
+OLLAMA_KEEP_ALIVE = "1h"
+# SYSTEM_PROMPT is ~700 tokens; a small fixed context keeps prompt eval cheap.
+# Must be identical on every call or Ollama reloads the model.
+OLLAMA_OPTIONS = {"temperature": 0.1, "num_ctx": 2048}
+
 # Logical "server" name for this host
 SERVER_NAME = "PG1"
 
 # Databases that live on this server (must match FastAPI validation)
 DATABASES = ["users_db", "products_db", "reports_db"]
+DATABASES_SET = frozenset(DATABASES)
+
+# db_name values that mean "every database on this server"
+SERVER_ALIASES = frozenset({"pg1", "server", SERVER_NAME.lower()})
 
 # WAL / BACKUP Configuration
 BACKUP_ROOT = os.environ.get("BACKUP_ROOT", "/root/sp-lakehouse-backup/project/backups")
@@ -42,24 +79,79 @@ FULL_BACKUP_DIR = os.path.join(BACKUP_ROOT, "full")
 # REAL data directory (from SHOW data_directory;)
 PG_DATA_DIR = os.environ.get("PGDATA", "/var/lib/pgsql/17/data")
 
+_PG_DATA = Path(PG_DATA_DIR)
+_BASE_BACKUP = Path(BASE_BACKUP_DIR)
+
+# Local superuser connection for control queries (archive_mode, pg_switch_wal)
+PG_CONNINFO = "host=localhost user=postgres dbname=postgres"
+
+# (connect, read) timeouts for quick FastAPI calls; a restore gets no read limit
+HTTP_TIMEOUT = (3, 60)
+HTTP_RESTORE_TIMEOUT = (3, None)
+
+# Long-running or destructive actions: their progress is printed as it
+# happens instead of being batched until the action finishes
+LIVE_OUTPUT_ACTIONS = frozenset({"PITR_RESTORE", "FULL_BACKUP", "LOGICAL_RESTORE", "BASE_BACKUP"})
+
+def _safety_timer_override() -> Optional[int]:
+    """$SAFETY_TIMER_SEC as whole seconds; None if unset or invalid."""
+    raw = os.environ.get("SAFETY_TIMER_SEC")
+    if raw is None:
+        return None
+    try:
+        sec = int(raw)
+    except ValueError:
+        sec = -1
+    if sec < 0:
+        print(f"⚠️ Ignoring SAFETY_TIMER_SEC={raw!r}: expected whole seconds (0 disables)")
+        return None
+    return sec
+
+
+# Overrides the safety_timer() countdown length; "0" disables it. Parsed once
+# here, so a bad value is reported at startup rather than mid-restore
+SAFETY_TIMER_SEC = _safety_timer_override()
+
+# Parallel unlinks in cleanup_old_wal_files (overlaps filesystem journal waits)
+WAL_CLEANUP_WORKERS = 16
+
 # Try these service names when stopping/starting PostgreSQL
 PG_SERVICE_CANDIDATES = ["postgresql-17", "postgresql"]
 
 # Ensure directories exist
 Path(WAL_ARCHIVE_DIR).mkdir(parents=True, exist_ok=True)
-Path(BASE_BACKUP_DIR).mkdir(parents=True, exist_ok=True)
+_BASE_BACKUP.mkdir(parents=True, exist_ok=True)
 Path(FULL_BACKUP_DIR).mkdir(parents=True, exist_ok=True)
 
 
 # ======================= SYSTEMD HELPERS (for auto PITR) =======================
 
-def _run_systemctl(action: str, service: str):
+# Unit that last answered a systemctl call; tried first from then on
+_resolved_service: Optional[str] = None
+
+# Properties fetched by get_postgres_status in one `systemctl show`
+_STATUS_PROPERTIES = "ActiveState,SubState,LoadState,UnitFileState"
+
+
+def _service_candidates():
+    """PG_SERVICE_CANDIDATES with the already-resolved unit (if any) first."""
+    if _resolved_service is None:
+        return PG_SERVICE_CANDIDATES
+    return [_resolved_service] + [s for s in PG_SERVICE_CANDIDATES if s != _resolved_service]
+
+
+def _remember_service(svc: str):
+    global _resolved_service
+    _resolved_service = svc
+
+
+def _run_systemctl(action: str, service: str, *args: str):
     """
     Helper to run systemctl commands safely.
     Returns (success: bool, output: str).
     """
     try:
-        cmd = ["systemctl", action, service]
+        cmd = ["systemctl", action, service, *args]
         result = subprocess.run(cmd, capture_output=True, text=True)
         ok = result.returncode == 0
         out = (result.stdout or "") + (result.stderr or "")
@@ -74,10 +166,11 @@ def stop_postgres_service():
     Returns (success: bool, service_used: str | None, output: str)
     """
     last_output = ""
-    for svc in PG_SERVICE_CANDIDATES:
+    for svc in _service_candidates():
         ok, out = _run_systemctl("stop", svc)
         last_output = out
         if ok:
+            _remember_service(svc)
             return True, svc, out or f"Stopped service {svc}"
     return False, None, last_output or "Unable to stop any PostgreSQL service"
 
@@ -88,10 +181,11 @@ def start_postgres_service():
     Returns (success: bool, service_used: str | None, output: str)
     """
     last_output = ""
-    for svc in PG_SERVICE_CANDIDATES:
+    for svc in _service_candidates():
         ok, out = _run_systemctl("start", svc)
         last_output = out
         if ok:
+            _remember_service(svc)
             return True, svc, out or f"Started service {svc}"
     return False, None, last_output or "Unable to start any PostgreSQL service"
 
@@ -99,13 +193,48 @@ def start_postgres_service():
 def get_postgres_status():
     """
     Returns (status: str, service_used: str | None, raw_output: str)
-    status ∈ {"active", "inactive", "failed", "unknown"}
+    status ∈ {"active", "inactive", "failed", "activating", "unknown", ...}
+    (systemd's ActiveState)
     """
-    for svc in PG_SERVICE_CANDIDATES:
-        ok, out = _run_systemctl("is-active", svc)
-        if ok:
-            return out.strip(), svc, out
-    return "unknown", None, "No active PostgreSQL service found"
+    for svc in _service_candidates():
+        ok, out = _run_systemctl("show", svc, f"--property={_STATUS_PROPERTIES}", "--no-pager")
+        if not ok:
+            continue
+        props = dict(line.split("=", 1) for line in out.splitlines() if "=" in line)
+        if props.get("LoadState") == "not-found":
+            continue
+        _remember_service(svc)
+        return props.get("ActiveState", "unknown"), svc, out
+    return "unknown", None, "No PostgreSQL service found"
+
+
+# ======================= POSTGRES CONNECTION =======================
+
+_pg_conn = None  # psycopg.Connection, opened by _pg_fetchone()
+
+
+def _pg_fetchone(query: str):
+    """
+    Run a control query on a connection kept open across commands (opened on
+    first use). A connection lost to a restart is reopened and retried once.
+    """
+    global _pg_conn
+    psycopg = _psycopg()
+    for attempt in range(2):
+        if _pg_conn is None or _pg_conn.closed:
+            _pg_conn = psycopg.connect(
+                PG_CONNINFO,
+                autocommit=True,
+                connect_timeout=10,
+                options="-c statement_timeout=30s",
+            )
+        try:
+            with _pg_conn.cursor() as cur:
+                cur.execute(query)
+                return cur.fetchone()
+        except psycopg.OperationalError:
+            if attempt or not _pg_conn.closed:
+                raise
 
 
 # ======================= WAL ARCHIVING SETUP =======================
@@ -128,8 +257,26 @@ WAL_NAME="$2"
 ARCHIVE_DIR="{WAL_ARCHIVE_DIR}"
 
 mkdir -p "$ARCHIVE_DIR"
-cp "$WAL_FILE" "$ARCHIVE_DIR/$WAL_NAME" || exit 1
-chmod 600 "$ARCHIVE_DIR/$WAL_NAME" || exit 1
+
+# Kernel-side copy (sendfile) into a 0600 temp file, fsync, then an atomic
+# rename so a half-written segment is never visible under its real name
+python3 -c '
+import os, sys
+src, dst = sys.argv[1:]
+tmp = dst + ".tmp"
+s = os.open(src, os.O_RDONLY)
+d = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+size, off = os.fstat(s).st_size, 0
+while off < size:
+    n = os.sendfile(d, s, off, size - off)
+    if n == 0:
+        sys.exit("short copy of " + src)
+    off += n
+os.fsync(d)
+os.close(d)
+os.close(s)
+os.rename(tmp, dst)
+' "$WAL_FILE" "$ARCHIVE_DIR/$WAL_NAME" || exit 1
 
 if [ ! -f "$ARCHIVE_DIR/$WAL_NAME" ]; then
     echo "Archive failed: $WAL_NAME" >&2
@@ -180,32 +327,32 @@ def force_wal_rotation():
     """
     print("\n🔄 Forcing WAL rotation (pg_switch_wal)...")
     try:
-        cmd = [
-            "psql",
-            "-h", "localhost",
-            "-U", "postgres",
-            "-d", "postgres",
-            "-c", "SELECT pg_switch_wal();",
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        if result.returncode != 0:
-            print(f"❌ WAL rotation failed:\n{result.stderr}")
+        try:
+            (lsn,) = _pg_fetchone("SELECT pg_switch_wal()")
+        except _psycopg().Error as e:
+            print(f"❌ WAL rotation failed:\n{e}")
             return False
 
         print("✅ WAL rotation successful")
-        print(f"   Output: {result.stdout.strip()}")
+        print(f"   Output: {lsn}")
         time.sleep(2)
         list_wal_files()
         return True
 
-    except subprocess.TimeoutExpired:
-        print("❌ WAL rotation timed out")
-        return False
     except Exception as e:
         print(f"❌ Error during WAL rotation: {e}")
         return False
 
 
+def _scan_wal():
+    """
+    Regular files in WAL_ARCHIVE_DIR, from a single directory pass.
+    DirEntry caches its stat(), so callers don't pay a syscall per file again.
+    """
+    with os.scandir(WAL_ARCHIVE_DIR) as it:
+        return [entry for entry in it if entry.is_file(follow_symlinks=False)]
+
+
 def list_wal_files():
     """
     List all archived WAL files.
@@ -217,24 +364,24 @@ def list_wal_files():
             return []
 
         wal_files = []
-        for filename in sorted(os.listdir(WAL_ARCHIVE_DIR)):
-            filepath = os.path.join(WAL_ARCHIVE_DIR, filename)
-            if os.path.isfile(filepath):
-                stat = os.stat(filepath)
-                size_mb = stat.st_size / (1024 * 1024)
-                mtime = datetime.fromtimestamp(stat.st_mtime)
-                wal_files.append(
-                    {
-                        "name": filename,
-                        "size_mb": round(size_mb, 2),
-                        "size_bytes": stat.st_size,
-                        "modified": mtime.isoformat(),
-                        "path": filepath,
-                    }
-                )
-                print(
-                    f"   • {filename:40s} {size_mb:6.1f}MB  {mtime.strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+        lines = []
+        for entry in sorted(_scan_wal(), key=lambda e: e.name):
+            stat = entry.stat()
+            size_mb = stat.st_size / (1024 * 1024)
+            mtime = datetime.fromtimestamp(stat.st_mtime)
+            wal_files.append(
+                {
+                    "name": entry.name,
+                    "size_mb": round(size_mb, 2),
+                    "size_bytes": stat.st_size,
+                    "modified": mtime.isoformat(),
+                    "path": entry.path,
+                }
+            )
+            lines.append(
+                f"   • {entry.name:40s} {size_mb:6.1f}MB  {mtime.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            )
+        sys.stdout.write("".join(lines))
 
         if not wal_files:
             print("   (No WAL files archived yet)")
@@ -251,18 +398,17 @@ def list_wal_files():
         return []
 
 
-def cleanup_old_wal_files(keep_count=50):
+def cleanup_old_wal_files(keep_count=50, verbose=False):
     """
     Clean up old WAL files, keeping only the most recent ones.
+    With verbose=True every deleted file is listed, not just the totals.
     """
     print(f"\n🧹 Cleaning up old WAL files (keeping {keep_count} most recent)...")
     try:
-        wal_files = []
-        for filename in os.listdir(WAL_ARCHIVE_DIR):
-            filepath = os.path.join(WAL_ARCHIVE_DIR, filename)
-            if os.path.isfile(filepath):
-                mtime = os.path.getmtime(filepath)
-                wal_files.append((filepath, mtime, filename))
+        wal_files = [
+            (entry.path, entry.stat().st_mtime, entry.name, entry.stat().st_size)
+            for entry in _scan_wal()
+        ]
 
         wal_files.sort(key=lambda x: x[1])
 
@@ -273,16 +419,28 @@ def cleanup_old_wal_files(keep_count=50):
         to_delete = wal_files[:-keep_count]
         deleted_count = 0
         deleted_size = 0
+        lines = []
 
-        for filepath, _, filename in to_delete:
+        def unlink(item):
             try:
-                size = os.path.getsize(filepath)
-                os.remove(filepath)
+                os.unlink(item[0])
+            except Exception as e:
+                return e
+            return None
+
+        with ThreadPoolExecutor(max_workers=WAL_CLEANUP_WORKERS) as pool:
+            errors = list(pool.map(unlink, to_delete))
+
+        # Sizes come from the scan, so no stat per deleted file
+        for (_, _, filename, size), e in zip(to_delete, errors):
+            if e is None:
                 deleted_count += 1
                 deleted_size += size
-                print(f"   🗑️  Deleted: {filename}")
-            except Exception as e:
-                print(f"   ⚠️  Failed to delete {filename}: {e}")
+                if verbose:
+                    lines.append(f"   🗑️  Deleted: {filename}\n")
+            else:
+                lines.append(f"   ⚠️  Failed to delete {filename}: {e}\n")
+        sys.stdout.write("".join(lines))
 
         print(
             f"\n   ✅ Cleanup complete: {deleted_count} files removed, {deleted_size / (1024**2):.1f} MB freed"
@@ -315,21 +473,11 @@ def verify_wal_archiving():
         checks.append(False)
 
     try:
-        cmd = [
-            "psql",
-            "-h",
-            "localhost",
-            "-U",
-            "postgres",
-            "-d",
-            "postgres",
-            "-t",
-            "-c",
-            "SHOW archive_mode;",
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            archive_mode = result.stdout.strip()
+        try:
+            (archive_mode,) = _pg_fetchone("SHOW archive_mode")
+        except _psycopg().Error:
+            archive_mode = None
+        if archive_mode is not None:
             if archive_mode == "on":
                 print(f"   ✅ PostgreSQL archive_mode: {archive_mode}")
                 checks.append(True)
@@ -368,28 +516,53 @@ def verify_wal_archiving():
         return False
 
 
+def _dir_size(path: str) -> int:
+    """
+    Total size of the regular files under path. One scandir per directory
+    and the dirent's stat per file, instead of os.walk + getsize.
+    """
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
 def list_available_base_backups():
     """
     List all available base backups in the BASE_BACKUP_DIR.
     Each one is a directory like: pg_base_YYYYMMDD_HHMMSS
     """
-    base_dir = Path(BASE_BACKUP_DIR)
-    if not base_dir.exists():
+    try:
+        dir_mtime_ns = os.stat(BASE_BACKUP_DIR).st_mtime_ns
+    except FileNotFoundError:
         return []
+    # Adding or removing a backup bumps the directory's mtime, which is the
+    # cache key; a listing followed by a PITR restore scans only once
+    return list(_scan_base_backups(dir_mtime_ns))
+
 
+@lru_cache(maxsize=1)
+def _scan_base_backups(dir_mtime_ns: int):
     backups = []
-    for item in base_dir.iterdir():
-        if item.is_dir():
-            backups.append(
-                {
-                    "name": item.name,
-                    "path": str(item),
-                    "created": datetime.fromtimestamp(item.stat().st_mtime).isoformat(),
-                }
-            )
+    with os.scandir(BASE_BACKUP_DIR) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                backups.append(
+                    {
+                        "name": entry.name,
+                        "path": entry.path,
+                        "created": datetime.fromtimestamp(entry.stat().st_mtime).isoformat(),
+                    }
+                )
 
     backups.sort(key=lambda x: x["created"], reverse=True)
-    return backups
+    return tuple(backups)
 
 
 def select_base_backup():
@@ -410,9 +583,55 @@ def select_base_backup():
 
 # ======================= AUDIT LOGGER =======================
 
+def _to_json(obj) -> str:
+    """Compact JSON text for audit entries."""
+    return orjson.dumps(obj, default=str).decode()
+
+
+def _pretty(obj) -> str:
+    """Indented JSON text for the console."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+
+
 class AuditLogger:
     def __init__(self, log_file="backup_audit.log"):
         self.log_file = log_file
+        # One handle for the session; a writer thread takes entries off the
+        # queue so log() never waits on the disk
+        self._fh = open(self.log_file, "ab", buffering=0)
+        self._q = queue.Queue()
+        self._writer = threading.Thread(target=self._drain, name="audit-log", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _drain(self):
+        while True:
+            line = self._q.get()
+            if line is None:
+                return
+            # Write everything queued so far in one go
+            lines = [line]
+            try:
+                while True:
+                    line = self._q.get_nowait()
+                    if line is None:
+                        self._q.put(None)
+                        break
+                    lines.append(line)
+            except queue.Empty:
+                pass
+            try:
+                self._fh.write(b"".join(lines))
+            except Exception as e:
+                print(f"⚠️ Failed to write audit log: {e}")
+
+    def close(self):
+        """Write out anything still queued and close the log file."""
+        if self._fh.closed:
+            return
+        self._q.put(None)
+        self._writer.join()
+        self._fh.close()
 
     def log(self, user_input, parsed, success, result):
         entry = {
@@ -423,20 +642,49 @@ class AuditLogger:
             "result": (result or "")[:300],
         }
         try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(entry) + "\n")
+            self._q.put_nowait(orjson.dumps(entry) + b"\n")
         except Exception as e:
             print(f"⚠️ Failed to write audit log: {e}")
 
 
+# ======================= CONSOLE =======================
+
+@contextmanager
+def _batched_stdout():
+    """
+    Turn off stdout's line buffering for the duration, so an action's dozens
+    of print() lines go out in a few large writes; flushed on exit.
+    input() still flushes before prompting.
+    """
+    out = sys.stdout
+    line_buffering = getattr(out, "line_buffering", False)
+    if line_buffering:
+        out.reconfigure(line_buffering=False)
+    try:
+        yield
+    finally:
+        out.flush()
+        if line_buffering:
+            out.reconfigure(line_buffering=True)
+
+
 # ======================= SAFETY =======================
 
 def safety_timer(sec=10):
+    if SAFETY_TIMER_SEC is not None:
+        sec = SAFETY_TIMER_SEC
+    # Nobody at the keyboard to press CTRL+C: don't hold scripted runs up
+    if sec <= 0 or not sys.stdin.isatty():
+        return True
+
     print(f"\n⏳ Safety Timer: {sec}s (CTRL+C to cancel)")
     try:
-        for i in range(sec, 0, -1):
-            print(f"   {i} seconds left...", end="\r")
-            time.sleep(1)
+        if sys.stdout.isatty():
+            for i in range(sec, 0, -1):
+                print(f"   {i} seconds left...", end="\r", flush=True)
+                time.sleep(1)
+        else:
+            time.sleep(sec)
         print("\n✅ Proceeding...")
         return True
     except KeyboardInterrupt:
@@ -454,6 +702,67 @@ def confirm(op, params):
 
 # ======================= AUTO PITR IMPLEMENTATION =======================
 
+# FICLONE from <linux/fs.h>: make dst share src's extents (Btrfs/XFS reflink)
+FICLONE = 0x40049409
+
+# ioctl errors meaning "this filesystem can't clone", not a real I/O failure
+_NO_REFLINK_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOTTY}
+
+
+def _postgres_owner():
+    """(uid, gid) of the postgres user/group, or None if they don't exist."""
+    try:
+        return pwd.getpwnam("postgres").pw_uid, grp.getgrnam("postgres").gr_gid
+    except KeyError:
+        return None
+
+
+def _reflink_or_copy(src: str, dst: str, owner=None):
+    """
+    Copy one file by cloning its extents when the filesystem supports it,
+    otherwise fall back to a regular copy (like cp --reflink=auto).
+    owner=(uid, gid) is applied while dst is open.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if owner:
+            os.fchown(fdst.fileno(), *owner)
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError as e:
+            if e.errno not in _NO_REFLINK_ERRNOS:
+                raise
+    shutil.copyfile(src, dst)
+
+
+def _reflink_tree(src: str, dst: str, owner=None):
+    """
+    Recreate the tree at src under dst, like shutil.copytree, but
+    reflinking file contents so a base backup restores in O(metadata).
+    owner=(uid, gid) is set on everything created, in the same walk.
+    """
+    os.makedirs(dst)
+    if owner:
+        os.chown(dst, *owner)
+    with os.scandir(src) as it:
+        for entry in it:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                _reflink_tree(entry.path, target, owner)
+            else:
+                _reflink_or_copy(entry.path, target, owner)
+                shutil.copystat(entry.path, target)
+    shutil.copystat(src, dst)
+
+
+def _has_recovery_settings(conf: Path, size: int) -> bool:
+    """Whether conf mentions restore_command/recovery_target_time (mmap scan, no read)."""
+    if not size:
+        return False
+    with open(conf, "rb") as f, mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+        return mm.find(b"restore_command") != -1 or mm.find(b"recovery_target_time") != -1
+
+
 def perform_pitr_restore(base_backup_name: str, target_time: Optional[str] = None):
     """
     REAL AUTOMATIC PITR RESTORE (Base Backup + WAL)
@@ -464,7 +773,7 @@ def perform_pitr_restore(base_backup_name: str, target_time: Optional[str] = Non
 
     print("\n⚙️  Starting REAL automatic PITR restore...")
 
-    base_dir = Path(BASE_BACKUP_DIR) / base_backup_name
+    base_dir = _BASE_BACKUP / base_backup_name
 
     if not base_dir.exists():
         msg = f"Base backup not found at {base_dir}"
@@ -490,19 +799,23 @@ def perform_pitr_restore(base_backup_name: str, target_time: Optional[str] = Non
 
     if os.path.exists(PG_DATA_DIR):
         print(f"2️⃣ Backing up current data directory → {backup_existing_dir}")
-        shutil.move(PG_DATA_DIR, backup_existing_dir)
+        # Same filesystem: one rename(2). shutil.move may quietly fall back
+        # to copying the whole cluster, so only use it when it really must.
+        if os.stat(PG_DATA_DIR).st_dev == os.stat(os.path.dirname(backup_existing_dir)).st_dev:
+            os.rename(PG_DATA_DIR, backup_existing_dir)
+        else:
+            print("   ⚠️ Pre-PITR backup is on another filesystem; copying PGDATA (slow)")
+            shutil.move(PG_DATA_DIR, backup_existing_dir)
     else:
         print("2️⃣ PGDATA does not exist yet, skipping pre-backup move")
 
-    # 3️⃣ Restore base backup (directory copy)
+    # 3️⃣ Restore base backup (reflinked directory copy)
     print(f"3️⃣ Restoring BASE BACKUP → {PG_DATA_DIR}")
-    shutil.copytree(base_dir, PG_DATA_DIR)
-
-    # Ownership
-    subprocess.run(["chown", "-R", "postgres:postgres", PG_DATA_DIR], check=False)
+    # Ownership (postgres:postgres) is set during the copy
+    _reflink_tree(str(base_dir), PG_DATA_DIR, _postgres_owner())
 
     # ✅ REQUIRED: backup_label must exist (basic sanity check)
-    if not Path(PG_DATA_DIR, "backup_label").exists():
+    if not (_PG_DATA / "backup_label").exists():
         return {
             "success": False,
             "error": "INVALID BASE BACKUP (backup_label missing)",
@@ -512,37 +825,45 @@ def perform_pitr_restore(base_backup_name: str, target_time: Optional[str] = Non
 
     # 4️⃣ Create recovery.signal
     print("4️⃣ Creating recovery.signal")
-    recovery_signal = Path(PG_DATA_DIR) / "recovery.signal"
+    recovery_signal = _PG_DATA / "recovery.signal"
     recovery_signal.touch(exist_ok=True)
     subprocess.run(["chown", "postgres:postgres", str(recovery_signal)], check=False)
 
     # 5️⃣ Configure WAL restore
     print("5️⃣ Writing restore_command + recovery_target_time into postgresql.auto.conf")
-    auto_conf = Path(PG_DATA_DIR) / "postgresql.auto.conf"
+    auto_conf = _PG_DATA / "postgresql.auto.conf"
 
-    # Optional: remove old restore_command/recovery_target_time lines
-    if auto_conf.exists():
-        try:
-            with open(auto_conf, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            new_lines = []
-            for line in lines:
-                if line.strip().startswith("restore_command") or line.strip().startswith("recovery_target_time"):
-                    continue
-                new_lines.append(line)
-            with open(auto_conf, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
-        except Exception as e:
-            print(f"   ⚠️ Could not clean old restore_command/recovery_target_time: {e}")
+    settings = f"\nrestore_command = 'cp {WAL_ARCHIVE_DIR}/%f %p'\n"
+    if target_time:
+        settings += f"recovery_target_time = '{target_time}'\n"
+    else:
+        # "latest" - just replay all WAL
+        settings += "# recovery_target_time not set -> restore to latest available WAL\n"
 
-    # Append our settings
-    with open(auto_conf, "a", encoding="utf-8") as f:
-        f.write(f"\nrestore_command = 'cp {WAL_ARCHIVE_DIR}/%f %p'\n")
-        if target_time:
-            f.write(f"recovery_target_time = '{target_time}'\n")
-        else:
-            # "latest" - just replay all WAL
-            f.write("# recovery_target_time not set -> restore to latest available WAL\n")
+    try:
+        old_stat = os.stat(auto_conf)
+    except FileNotFoundError:
+        old_stat = None
+
+    if old_stat is not None and _has_recovery_settings(auto_conf, old_stat.st_size):
+        # Drop old restore_command/recovery_target_time lines and add ours in
+        # one rewrite; the rename means PostgreSQL never sees a half-written file
+        with open(auto_conf, "r", encoding="utf-8") as f:
+            kept = [
+                line for line in f
+                if not line.strip().startswith(("restore_command", "recovery_target_time"))
+            ]
+        tmp_conf = auto_conf.with_name(auto_conf.name + ".tmp")
+        tmp_conf.write_text("".join(kept) + settings, encoding="utf-8")
+        os.chown(tmp_conf, old_stat.st_uid, old_stat.st_gid)
+        os.chmod(tmp_conf, old_stat.st_mode)
+        os.replace(tmp_conf, auto_conf)
+    else:
+        # Usual case for a fresh base backup: nothing to remove, just append
+        with open(auto_conf, "a", encoding="utf-8") as f:
+            f.write(settings)
+        if old_stat is None:
+            subprocess.run(["chown", "postgres:postgres", str(auto_conf)], check=False)
 
     # 6️⃣ Start PostgreSQL
     print("6️⃣ Starting PostgreSQL for WAL replay...")
@@ -581,7 +902,7 @@ There is ONE logical server called "{SERVER_NAME}" with these databases:
 {DATABASES}
 
 VERY IMPORTANT DISTINCTION:
-- LOGICAL backups are .sql files per-database (created by /backup/full)
+- LOGICAL backups are <db>_full_YYYYMMDD_HHMMSS pg_dump directories per-database (created by /backup/full)
 - BASE backups are pg_base_YYYYMMDD_HHMMSS directories (used for PITR with WAL)
 
 SUPPORTED INTENTS (map them carefully):
@@ -598,12 +919,12 @@ SUPPORTED INTENTS (map them carefully):
 
 - "list base backups"  (list pg_base_YYYYMMDD_HHMMSS directories)
 
-- "list backups for users_db"  (list LOGICAL .sql backups for that DB)
-- "list backups for pg1" / "list backups for server" (list LOGICAL .sql for all DBs)
+- "list backups for users_db"  (list LOGICAL backups for that DB)
+- "list backups for pg1" / "list backups for server" (list LOGICAL backups for all DBs)
 
 - "list servers"
 
-- "logical restore users_db from users_db_full_xxx.sql"
+- "logical restore users_db from users_db_full_YYYYMMDD_HHMMSS"
   (use LOGICAL_RESTORE, NOT PITR)
 
 - "restore to point in time using pg_base_YYYYMMDD_HHMMSS"
@@ -641,14 +962,14 @@ YOU MUST RETURN EXACTLY ONE OF THESE JSON SHAPES:
    {{ "HEALTH": {{}} }}
 
 10) LOGICAL RESTORE
-   {{ "LOGICAL_RESTORE": {{ "db_name": "users_db", "backup_file": "users_db_full_20251210_120000.sql" }} }}
+   {{ "LOGICAL_RESTORE": {{ "db_name": "users_db", "backup_file": "users_db_full_20251210_120000" }} }}
 
 11) PITR RESTORE (AUTO)
    {{ "PITR_RESTORE": {{ "base_backup_name": "pg_base_20251210_172506", "target_time": null }} }}
    or with time:
    {{ "PITR_RESTORE": {{ "base_backup_name": "pg_base_20251210_172506", "target_time": "2025-12-10 17:20:00" }} }}
 
-12) LIST BACKUPS (LOGICAL .sql BACKUPS)
+12) LIST BACKUPS (LOGICAL BACKUPS)
    {{ "LIST_BACKUPS": {{ "db_name": "users_db" }} }}
    {{ "LIST_BACKUPS": {{ "db_name": "pg1" }} }}
 
@@ -668,421 +989,536 @@ STRICT RULES:
 class Orchestrator:
     def __init__(self):
         self.audit = AuditLogger()
+        # One loop for the whole session so the async client's pooled
+        # connections survive between commands
+        self._loop = asyncio.new_event_loop()
+        # action key -> handler; execute() does one lookup instead of testing
+        # every operation in turn
+        self._handlers = {
+            "SETUP_WAL": self._handle_setup_wal,
+            "VERIFY_WAL": self._handle_verify_wal,
+            "LIST_WAL": self._handle_list_wal,
+            "CLEANUP_WAL": self._handle_cleanup_wal,
+            "LIST_BASE_BACKUPS": self._handle_list_base_backups,
+            "LIST_SERVERS": self._handle_list_servers,
+            "HEALTH": self._handle_health,
+            "PITR_RESTORE": self._handle_pitr_restore,
+            "FULL_BACKUP": self._handle_full_backup,
+            "BASE_BACKUP": self._handle_base_backup,
+            "WAL_ROTATE": self._handle_wal_rotate,
+            "LIST_BACKUPS": self._handle_list_backups,
+            "LOGICAL_RESTORE": self._handle_logical_restore,
+        }
+        self._http_async = None
+        self._http = None
+        # Off the main thread, so the first prompt doesn't wait for the
+        # ollama import and the model load
+        threading.Thread(target=self._warm_model, name="warm-model", daemon=True).start()
+
+    @property
+    def http_async(self):
+        """Shared httpx.AsyncClient for the per-database fan-out calls."""
+        if self._http_async is None:
+            import httpx
+
+            self._http_async = httpx.AsyncClient(base_url=FASTAPI, timeout=None)
+        return self._http_async
+
+    @property
+    def http(self):
+        """Keep-alive requests.Session for the blocking calls (servers, health, restore)."""
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            self._http = requests.Session()
+            self._http.mount(
+                FASTAPI,
+                HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=8,
+                    max_retries=Retry(total=2, backoff_factor=0.2),
+                ),
+            )
+            self._http.headers.update({"Connection": "keep-alive"})
+        return self._http
+
+    def _warm_model(self):
+        """
+        Load the model and evaluate SYSTEM_PROMPT once up front. Later calls
+        start with the same system message, so Ollama reuses the cached prefix
+        and only evaluates the user's command.
+        """
+        try:
+            _ollama().chat(
+                model=MODEL,
+                messages=[{"role": "system", "content": SYSTEM_PROMPT}],
+                options={**OLLAMA_OPTIONS, "num_predict": 1},
+                keep_alive=OLLAMA_KEEP_ALIVE,
+            )
+        except Exception as e:
+            print(f"⚠️ Could not preload {MODEL}: {e}")
 
     def ask_ai(self, text):
-        res = ollama.chat(
+        res = _ollama().chat(
             model=MODEL,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": text},
             ],
             format="json",
-            options={"temperature": 0.1},
+            options=OLLAMA_OPTIONS,
+            keep_alive=OLLAMA_KEEP_ALIVE,
         )
+        # format="json" constrains decoding to bare JSON, so there are no
+        # markdown fences to strip
         raw = res["message"]["content"].strip()
-        raw = raw.replace("```json", "").replace("```", "").strip()
         try:
-            return json.loads(raw)
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                return json.loads(raw)
         except Exception as e:
             print("❌ AI returned invalid JSON:")
             print(raw)
             print(f"Error: {e}")
             return None
 
-    def _run_full_backup_single(self, db_name: str):
-        r = requests.post(f"{FASTAPI}/backup/full", json={"db_name": db_name})
+    async def _run_full_backup_single(self, db_name: str):
+        r = await self.http_async.post("/backup/full", json={"db_name": db_name})
         try:
             return r.json()
         except Exception:
             return {"raw": r.text}
 
-    def _run_list_backups_single(self, db_name: str):
-        r = requests.get(f"{FASTAPI}/backups/{db_name}")
+    async def _run_list_backups_single(self, db_name: str):
+        r = await self.http_async.get(f"/backups/{db_name}")
         try:
             return r.json()
         except Exception:
             return {"raw": r.text}
 
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    def _for_each_db(self, func):
+        """
+        Run func(db) for every database concurrently; wall time is the
+        slowest call rather than the sum. Failures come back as {"error": ...}.
+        """
+        async def gather():
+            return await asyncio.gather(
+                *(func(db) for db in DATABASES), return_exceptions=True
+            )
+
+        results = self._run(gather())
+        return [
+            (db, {"error": str(res)} if isinstance(res, Exception) else res)
+            for db, res in zip(DATABASES, results)
+        ]
+
     def execute(self, action, user_input):
+        if isinstance(action, dict) and not LIVE_OUTPUT_ACTIONS.isdisjoint(action):
+            self._execute(action, user_input)
+            return
+        with _batched_stdout():
+            self._execute(action, user_input)
+
+    def _execute(self, action, user_input):
         if not action:
             return
 
         try:
-            # SETUP WAL
-            if "SETUP_WAL" in action:
-                result = setup_wal_archiving()
-                self.audit.log(
-                    user_input,
-                    action,
-                    result,
-                    "WAL setup completed" if result else "WAL setup failed",
-                )
+            # First key of the action that names a known operation
+            key = next((k for k in action if k in self._handlers), None)
+            if key is None:
+                print(f"❌ Unknown action: {list(action.keys())}")
+                self.audit.log(user_input, action, False, "Unknown action")
                 return
+            self._handlers[key](action, user_input)
+        except Exception as e:
+            print(f"❌ Execution error: {e}")
+            import traceback
 
-            # VERIFY WAL
-            if "VERIFY_WAL" in action:
-                result = verify_wal_archiving()
-                self.audit.log(
-                    user_input, action, result, "WAL verification completed"
-                )
-                return
+            traceback.print_exc()
+            self.audit.log(user_input, action, False, str(e))
 
-            # LIST WAL
-            if "LIST_WAL" in action:
-                wal_files = list_wal_files()
-                self.audit.log(
-                    user_input, action, True, f"Found {len(wal_files)} WAL files"
-                )
-                return
+    # SETUP WAL
+    def _handle_setup_wal(self, action, user_input):
+        result = setup_wal_archiving()
+        self.audit.log(
+            user_input,
+            action,
+            result,
+            "WAL setup completed" if result else "WAL setup failed",
+        )
 
-            # CLEANUP WAL
-            if "CLEANUP_WAL" in action:
-                payload = action.get("CLEANUP_WAL") or {}
-                keep_count = payload.get("keep_count", 50)
-                cleanup_old_wal_files(keep_count)
-                self.audit.log(
-                    user_input,
-                    action,
-                    True,
-                    f"WAL cleanup with keep_count={keep_count}",
-                )
-                return
+    # VERIFY WAL
+    def _handle_verify_wal(self, action, user_input):
+        result = verify_wal_archiving()
+        self.audit.log(
+            user_input, action, result, "WAL verification completed"
+        )
 
-            # LIST BASE BACKUPS
-            if "LIST_BASE_BACKUPS" in action:
-                print("\n📦 Available Base Backups for PITR:\n")
-                backups = list_available_base_backups()
-                if not backups:
-                    print("   ❌ No base backups found!")
-                    print("   💡 Create one first: 'take base backup'\n")
-                else:
-                    for i, backup in enumerate(backups, 1):
-                        print(f"   {i}. {backup['name']}")
-                        print(f"      Path: {backup['path']}")
-                        print(f"      Created: {backup['created']}\n")
-                    print(f"   Total: {len(backups)} base backup(s)\n")
-                    print("   🔁 To use one for PITR, say:")
-                    print("      restore to point in time using <name>")
-                    print("      or")
-                    print("      restore to point in time using <name> at YYYY-MM-DD HH:MM:SS\n")
-                self.audit.log(
-                    user_input, action, True, f"Found {len(backups)} base backups"
+    # LIST WAL
+    def _handle_list_wal(self, action, user_input):
+        wal_files = list_wal_files()
+        self.audit.log(
+            user_input, action, True, f"Found {len(wal_files)} WAL files"
+        )
+
+    # CLEANUP WAL
+    def _handle_cleanup_wal(self, action, user_input):
+        payload = action.get("CLEANUP_WAL") or {}
+        keep_count = payload.get("keep_count", 50)
+        cleanup_old_wal_files(keep_count)
+        self.audit.log(
+            user_input,
+            action,
+            True,
+            f"WAL cleanup with keep_count={keep_count}",
+        )
+
+    # LIST BASE BACKUPS
+    def _handle_list_base_backups(self, action, user_input):
+        print("\n📦 Available Base Backups for PITR:\n")
+        backups = list_available_base_backups()
+        if not backups:
+            print("   ❌ No base backups found!")
+            print("   💡 Create one first: 'take base backup'\n")
+        else:
+            for i, backup in enumerate(backups, 1):
+                print(f"   {i}. {backup['name']}")
+                print(f"      Path: {backup['path']}")
+                print(f"      Created: {backup['created']}\n")
+            print(f"   Total: {len(backups)} base backup(s)\n")
+            print("   🔁 To use one for PITR, say:")
+            print("      restore to point in time using <name>")
+            print("      or")
+            print("      restore to point in time using <name> at YYYY-MM-DD HH:MM:SS\n")
+        self.audit.log(
+            user_input, action, True, f"Found {len(backups)} base backups"
+        )
+
+    # LIST SERVERS
+    def _handle_list_servers(self, action, user_input):
+        r = self.http.get(f"{FASTAPI}/servers", timeout=HTTP_TIMEOUT)
+        try:
+            data = r.json()
+        except Exception:
+            data = {"raw": r.text}
+        print("\n🖥️ SERVERS:")
+        print(_pretty(data))
+        self.audit.log(user_input, action, True, _to_json(data))
+
+    # HEALTH
+    def _handle_health(self, action, user_input):
+        r = self.http.get(f"{FASTAPI}/health", timeout=HTTP_TIMEOUT)
+        try:
+            data = r.json()
+            print("\n✅ HEALTH CHECK:")
+            print(_pretty(data))
+            self.audit.log(user_input, action, True, _to_json(data))
+        except Exception:
+            print(r.text)
+            self.audit.log(user_input, action, False, r.text)
+
+    # 👉 AUTO PITR RESTORE
+    def _handle_pitr_restore(self, action, user_input):
+        payload = action.get("PITR_RESTORE") or {}
+        base_backup_name = payload.get("base_backup_name")
+        target_time = payload.get("target_time")
+
+        # Defensive: handle None safely
+        if isinstance(base_backup_name, str):
+            base_backup_name = base_backup_name.strip()
+        else:
+            base_backup_name = ""
+
+        if isinstance(target_time, str):
+            target_time = target_time.strip() or None
+        else:
+            target_time = None
+
+        if not base_backup_name:
+            print("\n❌ No base backup name specified.")
+            backups = select_base_backup()
+            if backups:
+                print("\n💡 Example:")
+                print(
+                    f"   restore to point in time using {backups[0]['name']}"
                 )
-                return
+            self.audit.log(
+                user_input, action, False, "No base backup specified"
+            )
+            return
 
-            # LIST SERVERS
-            if "LIST_SERVERS" in action:
-                r = requests.get(f"{FASTAPI}/servers")
-                try:
-                    data = r.json()
-                except Exception:
-                    data = {"raw": r.text}
-                print("\n🖥️ SERVERS:")
-                print(json.dumps(data, indent=2))
-                self.audit.log(user_input, action, True, json.dumps(data))
-                return
+        # Confirm PITR restore
+        print(f"\n⚠️ Preparing automatic PITR restore using: {base_backup_name}")
+        if target_time:
+            print(f"   Target time: {target_time}")
+        else:
+            print("   Target time: LATEST (replay all WAL)")
 
-            # HEALTH
-            if "HEALTH" in action:
-                r = requests.get(f"{FASTAPI}/health")
-                try:
-                    data = r.json()
-                    print("\n✅ HEALTH CHECK:")
-                    print(json.dumps(data, indent=2))
-                    self.audit.log(user_input, action, True, json.dumps(data))
-                except Exception:
-                    print(r.text)
-                    self.audit.log(user_input, action, False, r.text)
-                return
+        if not confirm("PITR_RESTORE", action):
+            print("❌ Cancelled by user")
+            return
+        if not safety_timer(10):
+            print("❌ Cancelled by safety timer")
+            return
 
-            # 👉 AUTO PITR RESTORE
-            if "PITR_RESTORE" in action:
-                payload = action.get("PITR_RESTORE") or {}
-                base_backup_name = payload.get("base_backup_name")
-                target_time = payload.get("target_time")
+        result = perform_pitr_restore(base_backup_name, target_time)
+        print("\n✅ PITR RESULT:")
+        print(_pretty(result))
+        self.audit.log(
+            user_input, action, result.get("success", False), _to_json(result)
+        )
 
-                # Defensive: handle None safely
-                if isinstance(base_backup_name, str):
-                    base_backup_name = base_backup_name.strip()
-                else:
-                    base_backup_name = ""
+    # FULL BACKUP (LOGICAL, pg_dump directory format)
+    def _handle_full_backup(self, action, user_input):
+        payload = action.get("FULL_BACKUP") or {}
+        requested = str(payload.get("db_name", "")).strip()
 
-                if isinstance(target_time, str):
-                    target_time = target_time.strip() or None
-                else:
-                    target_time = None
+        if not requested:
+            msg = "FULL_BACKUP requires 'db_name'"
+            print(f"❌ {msg}")
+            self.audit.log(user_input, action, False, msg)
+            return
 
-                if not base_backup_name:
-                    print("\n❌ No base backup name specified.")
-                    backups = select_base_backup()
-                    if backups:
-                        print("\n💡 Example:")
-                        print(
-                            f"   restore to point in time using {backups[0]['name']}"
-                        )
-                    self.audit.log(
-                        user_input, action, False, "No base backup specified"
-                    )
-                    return
+        if requested.lower() in SERVER_ALIASES:
+            print(
+                f"\n📦 Server-level logical backup: ALL databases on {SERVER_NAME}\n"
+            )
+            print(f"📦 Backing up {', '.join(DATABASES)} in parallel...")
+            results = []
+            for db, res in self._for_each_db(self._run_full_backup_single):
+                print(f"\n📦 {db}:")
+                print(_pretty(res))
+                results.append({"db": db, "result": res})
+            print("\n✅ Server-level logical backup complete (pg_dump directories)")
+            self.audit.log(user_input, action, True, _to_json(results))
+            return
 
-                # Confirm PITR restore
-                print(f"\n⚠️ Preparing automatic PITR restore using: {base_backup_name}")
-                if target_time:
-                    print(f"   Target time: {target_time}")
-                else:
-                    print("   Target time: LATEST (replay all WAL)")
-
-                if not confirm("PITR_RESTORE", action):
-                    print("❌ Cancelled by user")
-                    return
-                if not safety_timer(10):
-                    print("❌ Cancelled by safety timer")
-                    return
-
-                result = perform_pitr_restore(base_backup_name, target_time)
-                print("\n✅ PITR RESULT:")
-                print(json.dumps(result, indent=2))
-                self.audit.log(
-                    user_input, action, result.get("success", False), json.dumps(result)
-                )
-                return
+        if requested in DATABASES_SET:
+            print(f"\n📦 Starting logical full backup for: {requested}")
+            res = self._run(self._run_full_backup_single(requested))
+            print("\n✅ BACKUP RESULT (pg_dump directory):")
+            print(_pretty(res))
+            self.audit.log(user_input, action, True, _to_json(res))
+            return
 
-            # FULL BACKUP (LOGICAL .sql)
-            if "FULL_BACKUP" in action:
-                payload = action.get("FULL_BACKUP") or {}
-                requested = str(payload.get("db_name", "")).strip()
+        msg = f"Unknown database: {requested}. Valid: {DATABASES}"
+        print(f"❌ {msg}")
+        self.audit.log(user_input, action, False, msg)
 
-                if not requested:
-                    msg = "FULL_BACKUP requires 'db_name'"
-                    print(f"❌ {msg}")
-                    self.audit.log(user_input, action, False, msg)
-                    return
+    # BASE BACKUP (PHYSICAL, for PITR)
+    def _handle_base_backup(self, action, user_input):
+        print("\n📦 Starting physical base backup (pg_basebackup)...")
+        print("   This creates a snapshot for PITR under BASE_BACKUP_DIR\n")
 
-                if requested.lower() in ["pg1", "server", SERVER_NAME.lower()]:
-                    print(
-                        f"\n📦 Server-level logical backup: ALL databases on {SERVER_NAME}\n"
-                    )
-                    results = []
-                    for db in DATABASES:
-                        print(f"\n📦 Backing up {db}...")
-                        res = self._run_full_backup_single(db)
-                        print(json.dumps(res, indent=2))
-                        results.append({"db": db, "result": res})
-                    print("\n✅ Server-level logical backup complete (.sql files)")
-                    self.audit.log(user_input, action, True, json.dumps(results))
-                    return
-
-                if requested in DATABASES:
-                    print(f"\n📦 Starting logical full backup for: {requested}")
-                    res = self._run_full_backup_single(requested)
-                    print("\n✅ BACKUP RESULT (.sql):")
-                    print(json.dumps(res, indent=2))
-                    self.audit.log(user_input, action, True, json.dumps(res))
-                    return
-
-                msg = f"Unknown database: {requested}. Valid: {DATABASES}"
-                print(f"❌ {msg}")
-                self.audit.log(user_input, action, False, msg)
-                return
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_name = f"pg_base_{timestamp}"
+        backup_path = os.path.join(BASE_BACKUP_DIR, backup_name)
 
-            # BASE BACKUP (PHYSICAL, for PITR)
-            if "BASE_BACKUP" in action:
-                print("\n📦 Starting physical base backup (pg_basebackup)...")
-                print("   This creates a snapshot for PITR under BASE_BACKUP_DIR\n")
-
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_name = f"pg_base_{timestamp}"
-                backup_path = os.path.join(BASE_BACKUP_DIR, backup_name)
-
-                try:
-                    print(f"🔄 Running pg_basebackup → {backup_path}")
-                    # Plain format (-Fp) to make directory-based restore easy
-                    cmd = [
-                        "pg_basebackup",
-                        "-h",
-                        "localhost",
-                        "-U",
-                        "postgres",
-                        "-D",
-                        backup_path,
-                        "-Fp",  # plain directory
-                        "-X",
-                        "stream",
-                        "-P",
-                    ]
-                    result = subprocess.run(
-                        cmd, capture_output=True, text=True, timeout=1200
-                    )
-                    if result.returncode != 0:
-                        print("\n❌ Base backup failed:")
-                        print(result.stderr)
-                        self.audit.log(user_input, action, False, result.stderr)
-                        return
-
-                    total_size = 0
-                    for root, dirs, files in os.walk(backup_path):
-                        for fname in files:
-                            total_size += os.path.getsize(os.path.join(root, fname))
-                    size_mb = total_size / (1024 * 1024)
-
-                    info = {
-                        "success": True,
-                        "type": "base",
-                        "server": SERVER_NAME,
-                        "base_backup_dir": backup_path,
-                        "name": backup_name,
-                        "size_mb": round(size_mb, 2),
-                        "timestamp": timestamp,
-                    }
-                    print("\n✅ Base backup completed:")
-                    print(json.dumps(info, indent=2))
-                    print("\n💡 Use this for PITR restore, e.g.:")
-                    print(f"   restore to point in time using {backup_name}")
-                    self.audit.log(user_input, action, True, json.dumps(info))
-                    return
-
-                except subprocess.TimeoutExpired:
-                    msg = "Base backup timed out"
-                    print(f"\n❌ {msg}")
-                    self.audit.log(user_input, action, False, msg)
-                    return
-                except Exception as e:
-                    msg = f"Base backup error: {e}"
-                    print(f"\n❌ {msg}")
-                    self.audit.log(user_input, action, False, msg)
-                    return
-
-            # WAL ROTATE
-            if "WAL_ROTATE" in action:
-                print("\n🔄 Performing WAL rotation (incremental backup)...")
-                ok = force_wal_rotation()
-                if ok:
-                    print("\n✅ Incremental backup complete (WAL rotation successful)")
-                    self.audit.log(
-                        user_input, action, True, "WAL rotation successful"
-                    )
-                else:
-                    print("\n❌ Incremental backup failed")
-                    self.audit.log(
-                        user_input, action, False, "WAL rotation failed"
-                    )
+        try:
+            print(f"🔄 Running pg_basebackup → {backup_path}")
+            # Plain format (-Fp) to make directory-based restore easy
+            cmd = [
+                "pg_basebackup",
+                "-h",
+                "localhost",
+                "-U",
+                "postgres",
+                "-D",
+                backup_path,
+                "-Fp",  # plain directory
+                "-X",
+                "stream",
+                "-P",
+            ]
+            # Stream -P progress as it arrives; keep only the tail
+            # for the audit log instead of buffering the whole run
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+            expired = threading.Event()
+
+            def expire():
+                expired.set()
+                proc.kill()
+
+            # stderr is read to EOF, so the 20-minute limit is a timer
+            killer = threading.Timer(1200, expire)
+            killer.start()
+            tail = deque(maxlen=200)
+            try:
+                for line in proc.stderr:
+                    sys.stdout.write(line)
+                    sys.stdout.flush()
+                    tail.append(line)
+                proc.wait()
+            finally:
+                killer.cancel()
+            if expired.is_set():
+                raise subprocess.TimeoutExpired(cmd, 1200)
+            if proc.returncode != 0:
+                print("\n❌ Base backup failed (see output above)")
+                # pg_basebackup's error comes last; the audit entry keeps 300 chars
+                self.audit.log(user_input, action, False, "".join(tail)[-300:])
                 return
 
-            # LIST BACKUPS (LOGICAL .sql backups)
-            if "LIST_BACKUPS" in action:
-                payload = action.get("LIST_BACKUPS") or {}
-                requested = str(payload.get("db_name", "")).strip()
+            total_size = _dir_size(backup_path)
+            size_mb = total_size / (1024 * 1024)
+
+            info = {
+                "success": True,
+                "type": "base",
+                "server": SERVER_NAME,
+                "base_backup_dir": backup_path,
+                "name": backup_name,
+                "size_mb": round(size_mb, 2),
+                "timestamp": timestamp,
+            }
+            print("\n✅ Base backup completed:")
+            print(_pretty(info))
+            print("\n💡 Use this for PITR restore, e.g.:")
+            print(f"   restore to point in time using {backup_name}")
+            self.audit.log(user_input, action, True, _to_json(info))
+            return
 
-                if not requested:
-                    msg = "LIST_BACKUPS requires 'db_name'"
-                    print(f"❌ {msg}")
-                    self.audit.log(user_input, action, False, msg)
-                    return
+        except subprocess.TimeoutExpired:
+            msg = "Base backup timed out"
+            print(f"\n❌ {msg}")
+            self.audit.log(user_input, action, False, msg)
+            return
+        except Exception as e:
+            msg = f"Base backup error: {e}"
+            print(f"\n❌ {msg}")
+            self.audit.log(user_input, action, False, msg)
+            return
 
-                # Server-level: list logical backups for all DBs
-                if requested.lower() in ["pg1", "server", SERVER_NAME.lower()]:
-                    print(
-                        f"\n📋 Listing LOGICAL (.sql) backups for ALL databases on {SERVER_NAME}:\n"
-                    )
-                    all_results = []
-                    for db in DATABASES:
-                        print(f"\n{'='*60}")
-                        print(f"Database: {db}  (LOGICAL .sql backups)")
-                        print("=" * 60)
-                        res = self._run_list_backups_single(db)
-                        if "full_backups" in res:
-                            backups = res["full_backups"]
-                            if backups:
-                                for i, backup in enumerate(backups, 1):
-                                    print(f"  {i}. {backup}")
-                                print(f"\n  Total: {len(backups)} backup(s)")
-                                print("  💡 To restore a .sql backup, say:")
-                                print(f"     logical restore {db} from <filename>.sql")
-                            else:
-                                print("  No logical (.sql) backups found")
-                        else:
-                            print(f"  Response: {res}")
-                        all_results.append({"db": db, "result": res})
-                    print(f"\n{'='*60}\n")
-                    self.audit.log(user_input, action, True, json.dumps(all_results))
-                    return
-
-                # Single database
-                if requested in DATABASES:
-                    print(f"\n📋 LOGICAL (.sql) backups for {requested}:\n")
-                    res = self._run_list_backups_single(requested)
-                    if "full_backups" in res:
-                        backups = res["full_backups"]
-                        if backups:
-                            for i, backup in enumerate(backups, 1):
-                                print(f"  {i}. {backup}")
-                            print(f"\n  Total: {len(backups)} backup(s)\n")
-                            print("  💡 To restore one of these, say:")
-                            print(
-                                f"     logical restore {requested} from <filename>.sql\n"
-                            )
-                        else:
-                            print("  No logical (.sql) backups found\n")
-                    else:
-                        print(json.dumps(res, indent=2))
-                    self.audit.log(user_input, action, True, json.dumps(res))
-                    return
+    # WAL ROTATE
+    def _handle_wal_rotate(self, action, user_input):
+        print("\n🔄 Performing WAL rotation (incremental backup)...")
+        ok = force_wal_rotation()
+        if ok:
+            print("\n✅ Incremental backup complete (WAL rotation successful)")
+            self.audit.log(
+                user_input, action, True, "WAL rotation successful"
+            )
+        else:
+            print("\n❌ Incremental backup failed")
+            self.audit.log(
+                user_input, action, False, "WAL rotation failed"
+            )
 
-                msg = f"Unknown database: {requested}. Valid: {DATABASES}"
-                print(f"❌ {msg}")
-                self.audit.log(user_input, action, False, msg)
-                return
+    # LIST BACKUPS (LOGICAL backups)
+    def _handle_list_backups(self, action, user_input):
+        payload = action.get("LIST_BACKUPS") or {}
+        requested = str(payload.get("db_name", "")).strip()
 
-            # LOGICAL RESTORE (.sql -> per-DB)
-            if "LOGICAL_RESTORE" in action:
-                payload = action.get("LOGICAL_RESTORE") or {}
-                db_name = payload.get("db_name", "").strip()
-                backup_file = payload.get("backup_file", "").strip()
+        if not requested:
+            msg = "LIST_BACKUPS requires 'db_name'"
+            print(f"❌ {msg}")
+            self.audit.log(user_input, action, False, msg)
+            return
 
-                if not db_name or not backup_file:
-                    msg = "LOGICAL_RESTORE requires 'db_name' and 'backup_file'"
-                    print(f"❌ {msg}")
-                    self.audit.log(user_input, action, False, msg)
-                    return
+        # Server-level: list logical backups for all DBs
+        if requested.lower() in SERVER_ALIASES:
+            print(
+                f"\n📋 Listing LOGICAL backups for ALL databases on {SERVER_NAME}:\n"
+            )
+            all_results = []
+            for db, res in self._for_each_db(self._run_list_backups_single):
+                print(f"\n{'='*60}")
+                print(f"Database: {db}  (LOGICAL backups)")
+                print("=" * 60)
+                if "full_backups" in res:
+                    backups = res["full_backups"]
+                    if backups:
+                        for i, backup in enumerate(backups, 1):
+                            print(f"  {i}. {backup}")
+                        print(f"\n  Total: {len(backups)} backup(s)")
+                        print("  💡 To restore one of these, say:")
+                        print(f"     logical restore {db} from <backup name>")
+                    else:
+                        print("  No logical backups found")
+                else:
+                    print(f"  Response: {res}")
+                all_results.append({"db": db, "result": res})
+            print(f"\n{'='*60}\n")
+            self.audit.log(user_input, action, True, _to_json(all_results))
+            return
 
-                print(
-                    f"\n⚠️ LOGICAL RESTORE (this uses .sql, NOT base backup + WAL)\n"
-                    f"   Database: {db_name}\n"
-                    f"   Backup file: {backup_file}\n"
-                )
+        # Single database
+        if requested in DATABASES_SET:
+            print(f"\n📋 LOGICAL backups for {requested}:\n")
+            res = self._run(self._run_list_backups_single(requested))
+            if "full_backups" in res:
+                backups = res["full_backups"]
+                if backups:
+                    for i, backup in enumerate(backups, 1):
+                        print(f"  {i}. {backup}")
+                    print(f"\n  Total: {len(backups)} backup(s)\n")
+                    print("  💡 To restore one of these, say:")
+                    print(
+                        f"     logical restore {requested} from <backup name>\n"
+                    )
+                else:
+                    print("  No logical backups found\n")
+            else:
+                print(_pretty(res))
+            self.audit.log(user_input, action, True, _to_json(res))
+            return
 
-                if not confirm("LOGICAL_RESTORE", action):
-                    print("❌ Cancelled by user")
-                    return
-                if not safety_timer(10):
-                    print("❌ Cancelled by safety timer")
-                    return
-
-                print(f"\n🔄 Restoring {db_name} from {backup_file}...")
-                r = requests.post(
-                    f"{FASTAPI}/restore/logical",
-                    json={"db_name": db_name, "backup_file": backup_file},
-                )
-                try:
-                    data = r.json()
-                    print("\n✅ LOGICAL RESTORE RESULT:")
-                    print(json.dumps(data, indent=2))
-                    self.audit.log(user_input, action, True, json.dumps(data))
-                except Exception:
-                    print(r.text)
-                    self.audit.log(user_input, action, False, r.text)
-                return
+        msg = f"Unknown database: {requested}. Valid: {DATABASES}"
+        print(f"❌ {msg}")
+        self.audit.log(user_input, action, False, msg)
+
+    # LOGICAL RESTORE (pg_dump backup -> per-DB)
+    def _handle_logical_restore(self, action, user_input):
+        payload = action.get("LOGICAL_RESTORE") or {}
+        db_name = payload.get("db_name", "").strip()
+        backup_file = payload.get("backup_file", "").strip()
+
+        if not db_name or not backup_file:
+            msg = "LOGICAL_RESTORE requires 'db_name' and 'backup_file'"
+            print(f"❌ {msg}")
+            self.audit.log(user_input, action, False, msg)
+            return
 
-            # UNKNOWN
-            print(f"❌ Unknown action: {list(action.keys())}")
-            self.audit.log(user_input, action, False, "Unknown action")
+        print(
+            f"\n⚠️ LOGICAL RESTORE (this uses a pg_dump backup, NOT base backup + WAL)\n"
+            f"   Database: {db_name}\n"
+            f"   Backup file: {backup_file}\n"
+        )
 
-        except Exception as e:
-            print(f"❌ Execution error: {e}")
-            import traceback
+        if not confirm("LOGICAL_RESTORE", action):
+            print("❌ Cancelled by user")
+            return
+        if not safety_timer(10):
+            print("❌ Cancelled by safety timer")
+            return
 
-            traceback.print_exc()
-            self.audit.log(user_input, action, False, str(e))
+        print(f"\n🔄 Restoring {db_name} from {backup_file}...")
+        r = self.http.post(
+            f"{FASTAPI}/restore/logical",
+            json={"db_name": db_name, "backup_file": backup_file},
+            timeout=HTTP_RESTORE_TIMEOUT,
+        )
+        try:
+            data = r.json()
+            print("\n✅ LOGICAL RESTORE RESULT:")
+            print(_pretty(data))
+            self.audit.log(user_input, action, True, _to_json(data))
+        except Exception:
+            print(r.text)
+            self.audit.log(user_input, action, False, r.text)
 
 
 # ======================= MAIN LOOP =======================
@@ -1110,9 +1546,9 @@ def main():
         print(f"   ✅ Base backup directory: {BASE_BACKUP_DIR}")
 
     print("\n💡 Useful commands:")
-    print("   • 'backup users_db'                 → logical .sql backup")
-    print("   • 'list backups for users_db'       → list .sql backups")
-    print("   • 'logical restore users_db from ...sql'")
+    print("   • 'backup users_db'                 → logical pg_dump backup")
+    print("   • 'list backups for users_db'       → list logical backups")
+    print("   • 'logical restore users_db from users_db_full_...'")
     print("   • 'take base backup'                → pg_base_YYYYMMDD_HHMMSS for PITR")
     print("   • 'list base backups'               → show PITR-capable base backups")
     print("   • 'rotate wal'                      → force WAL rotation")
@@ -1135,7 +1571,7 @@ def main():
             print("\n🤔 Thinking...")
             action = orch.ask_ai(user_input)
             if action:
-                print(f"📋 Parsed Action: {json.dumps(action, indent=2)}")
+                print(f"📋 Parsed Action: {_pretty(action)}")
                 orch.execute(action, user_input)
             else:
                 print("❌ Failed to parse command")
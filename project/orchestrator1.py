@@ -8,27 +8,74 @@ import sys
 import json
 import os
 from datetime import datetime, timedelta
-from fastapi_client import MCPBackupClient 
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 import asyncio
+import atexit
+import threading
 import time
 
-try:
-    import ollama
-except ImportError:
-    print("Error: ollama package not found. Install it with: pip install ollama")
-    sys.exit(1)
+
+@lru_cache(maxsize=None)
+def _get_ollama():
+    """Import ollama on first use; it pulls in httpx and friends."""
+    try:
+        import ollama
+    except ImportError:
+        print("Error: ollama package not found. Install it with: pip install ollama")
+        sys.exit(1)
+    return ollama
 
 
 # ============================================================================
 # Audit Logger
 # ============================================================================
 
+# Buffered audit entries are written once this many pile up...
+AUDIT_FLUSH_ENTRIES = 32
+# ...and the rest at least this often, by a background thread
+AUDIT_FLUSH_INTERVAL = 2.0
+
+
 class AuditLogger:
     """Logs all commands for security and debugging."""
     
     def __init__(self, log_file="backup_audit.log"):
         self.log_file = log_file
+        # One handle for the session; entries are written in batches
+        self._fh = open(self.log_file, 'a', buffering=1 << 16)
+        self._buf: List[str] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        # Full batches are written by log_command; this thread writes partial
+        # ones, so a crash loses at most AUDIT_FLUSH_INTERVAL seconds of entries
+        threading.Thread(target=self._flush_periodically, name="audit-flush", daemon=True).start()
+        atexit.register(self._flush_all)
+    
+    def _flush_locked(self):
+        self._fh.writelines(self._buf)
+        self._fh.flush()
+        self._buf.clear()
+    
+    def _flush_periodically(self):
+        while not self._closed.wait(AUDIT_FLUSH_INTERVAL):
+            try:
+                with self._lock:
+                    if self._buf and not self._fh.closed:
+                        self._flush_locked()
+            except Exception as e:
+                print(f"⚠️ Failed to write audit log: {e}")
+    
+    def _flush_all(self):
+        """Write out buffered entries and close the log (runs at exit)."""
+        self._closed.set()
+        with self._lock:
+            if self._fh.closed:
+                return
+            try:
+                self._flush_locked()
+            finally:
+                self._fh.close()
         
     def log_command(self, user_input: str, command: Dict, success: bool, result: str):
         """Log a command execution."""
@@ -42,30 +89,51 @@ class AuditLogger:
         }
         
         try:
-            with open(self.log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + "\n")
+            with self._lock:
+                self._buf.append(json.dumps(log_entry) + "\n")
+                if len(self._buf) >= AUDIT_FLUSH_ENTRIES:
+                    self._flush_locked()
         except Exception as e:
             print(f"⚠️ Failed to write audit log: {e}")
     
+    def _tail_lines(self, count: int, block_size: int = 1 << 16) -> List[bytes]:
+        """Last `count` lines of the log, reading backwards from the end in blocks."""
+        with open(self.log_file, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            # count + 1 newlines guarantee `count` complete lines (plus the trailing one)
+            while pos > 0 and data.count(b"\n") <= count:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if pos > 0:
+            # First piece is a partial line cut by the block boundary
+            lines = lines[1:]
+        return lines[-count:]
+    
     def show_recent_logs(self, count=10):
         """Show recent command history."""
         try:
-            with open(self.log_file, 'r') as f:
-                lines = f.readlines()
-                recent = lines[-count:] if len(lines) > count else lines
-                
-                print("\n📜 Recent Command History:\n")
-                for line in recent:
-                    try:
-                        entry = json.loads(line)
-                        print(f"[{entry['timestamp']}]")
-                        print(f"  Input: {entry['user_input']}")
-                        print(f"  Operation: {entry['parsed_command'].get('operation')}")
-                        print(f"  Success: {'✅' if entry['success'] else '❌'}")
-                        print()
-                    except:
-                        continue
-                        
+            # Include entries still waiting in the buffer
+            with self._lock:
+                if self._buf:
+                    self._flush_locked()
+            recent = self._tail_lines(count)
+            
+            print("\n📜 Recent Command History:\n")
+            for line in recent:
+                try:
+                    entry = json.loads(line)
+                    print(f"[{entry['timestamp']}]")
+                    print(f"  Input: {entry['user_input']}")
+                    print(f"  Operation: {entry['parsed_command'].get('operation')}")
+                    print(f"  Success: {'✅' if entry['success'] else '❌'}")
+                    print()
+                except:
+                    continue
+                    
         except FileNotFoundError:
             print("📜 No audit log found yet.")
         except Exception as e:
@@ -328,7 +396,7 @@ For ambiguous requests, set confidence < 0.7 and include "clarification" field.
         })
         
         try:
-            response = ollama.chat(
+            response = _get_ollama().chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": self.get_system_prompt()},
@@ -1085,7 +1153,7 @@ def main():
     # Check Ollama availability
     print("\n🔍 Checking Ollama...")
     try:
-        models = ollama.list()
+        models = _get_ollama().list()
         print(f"✅ Ollama is running ({len(models.get('models', []))} models available)")
     except Exception as e:
         print(f"❌ Ollama not available: {e}")
@@ -1095,6 +1163,8 @@ def main():
     # Initialize client and assistant
     print("\n🔧 Initializing backup system...")
     try:
+        from fastapi_client import MCPBackupClient
+        
         client = MCPBackupClient("http://localhost:8000")
         assistant = BackupAssistant(client, model="llama3.1")
         print("✅ System ready!\n")
@@ -1111,7 +1181,7 @@ def main():
     print("🔥 Warming up AI model...")
     try:
         warmup_start = datetime.now()
-        ollama.chat(
+        _get_ollama().chat(
             model="llama3.1",
             messages=[{"role": "user", "content": "hello"}],
             options={"num_predict": 10}